@@ -0,0 +1,65 @@
+"""
+Синтетические страницы распродаж для бенчмарков
+"""
+
+import random
+from typing import Optional
+
+
+def synthetic_page(
+    cards: int,
+    seed: int = 0,
+    noise_blocks: Optional[int] = None,
+    currency: str = "р.",
+    first_id: int = 0
+) -> str:
+    """
+    Страница распродажи с заданным числом карточек товаров
+    
+    Кроме карточек содержит "шум" (меню, баннеры, футер), как настоящие
+    страницы магазинов: частичный разбор выигрывает именно на нем.
+    Номера товаров начинаются с first_id (для страниц одного каталога).
+    """
+    rnd = random.Random(seed)
+    noise_blocks = cards // 2 if noise_blocks is None else noise_blocks
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Акции</title></head><body>",
+        "<nav class='menu'>",
+    ]
+    parts.extend(
+        f"<li class='menu-item'><a href='/catalog/{i}/'>Раздел {i}</a></li>"
+        for i in range(noise_blocks)
+    )
+    parts.append("</nav><main class='catalog'>")
+    
+    for i in range(first_id, first_id + cards):
+        old_price = rnd.randint(100, 500000) / 100
+        new_price = round(old_price * rnd.uniform(0.4, 0.95), 2)
+        parts.append(
+            f"<div class='product-card' data-id='{i}'>"
+            f"<a class='product-link' href='/product/{i}/'>"
+            f"<img src='https://cdn.example.by/img/{i}.jpg' alt=''></a>"
+            f"<h3 class='product-title'>Товар со скидкой №{i}</h3>"
+            f"<div class='prices'><span class='old-price'>{old_price:.2f} {currency}</span>"
+            f"<span class='new-price'>{new_price:.2f} {currency}</span></div>"
+            f"<button class='to-cart'>В корзину</button></div>"
+        )
+    
+    parts.append("</main><footer>")
+    parts.extend(
+        f"<div class='banner'><p>Реклама {i}</p><img src='/b/{i}.png'></div>"
+        for i in range(noise_blocks)
+    )
+    parts.append("</footer></body></html>")
+    return "".join(parts)
+
+
+# Селекторы карточек синтетической страницы
+CARD_SELECTOR = '.product-card'
+CARD_FIELDS = (
+    ('.product-title', None),
+    ('.old-price', None),
+    ('.new-price', None),
+    ('img', 'src'),
+    ('a', 'href'),
+)
@@ -0,0 +1,92 @@
+"""
+Бенчмарк бэкендов парсинга HTML
+
+Время разбора и пиковая память (tracemalloc) для каждого бэкенда
+на записанных страницах или на синтетических страницах разного размера.
+
+Использование:
+    python -m benchmarks.parsers                       # синтетические страницы
+    python -m benchmarks.parsers page.html --selector '.product-card'
+"""
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+from src.scrapers.parsing import PARSERS, PARSER_LXML, extract_cards, parse_page
+from benchmarks.pages import synthetic_page, CARD_SELECTOR, CARD_FIELDS
+
+
+def legacy_extract_cards(html: str, selector: str, fields, parser: str):
+    """Прежний способ: select по карточкам и select_one на каждое поле"""
+    soup = parse_page(html, parser)
+    cards = []
+    for card in soup.select(selector):
+        values = []
+        for field_selector, attr in fields:
+            elem = card.select_one(field_selector)
+            if elem is None:
+                values.append(None)
+            elif attr is None:
+                values.append(elem.get_text(strip=True))
+            else:
+                values.append(elem.get(attr))
+        cards.append(tuple(values))
+    return cards
+
+
+def measure(func: Callable, repeat: int) -> Tuple[float, float]:
+    """Лучшее время (сек) и пиковая память (МБ)"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / (1024 * 1024)
+
+
+def run(name: str, html: str, selector: str, repeat: int):
+    """Замер всех бэкендов на одной странице"""
+    print(f"\n{name} ({len(html) / 1024:.0f} КБ)")
+    print(f"{'бэкенд':<14}{'карточек':>10}{'время, мс':>12}{'память, МБ':>12}")
+    for parser in PARSERS:
+        cards = extract_cards(html, selector, CARD_FIELDS, parser)
+        elapsed, peak = measure(
+            lambda: extract_cards(html, selector, CARD_FIELDS, parser), repeat
+        )
+        print(f"{parser:<14}{len(cards):>10}{elapsed * 1000:>12.1f}{peak:>12.1f}")
+    
+    # Для сравнения: извлечение полей через select_one на каждое поле карточки
+    cards = legacy_extract_cards(html, selector, CARD_FIELDS, PARSER_LXML)
+    elapsed, peak = measure(
+        lambda: legacy_extract_cards(html, selector, CARD_FIELDS, PARSER_LXML), repeat
+    )
+    print(f"{'select_one':<14}{len(cards):>10}{elapsed * 1000:>12.1f}{peak:>12.1f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('pages', nargs='*', help="Записанные HTML страницы")
+    arg_parser.add_argument('--selector', default=CARD_SELECTOR, help="Селектор карточки")
+    arg_parser.add_argument('--sizes', default="100,1000,10000", help="Размеры синтетических страниц")
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+    
+    if args.pages:
+        for page in args.pages:
+            html = Path(page).read_text(encoding='utf-8', errors='replace')
+            run(page, html, args.selector, args.repeat)
+    else:
+        for size in (int(value) for value in args.sizes.split(',')):
+            run(f"синтетическая страница, {size} карточек", synthetic_page(size), CARD_SELECTOR, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
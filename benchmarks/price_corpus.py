@@ -0,0 +1,39 @@
+"""
+Корпус цен BYN: записи цен в том виде, в каком они встречаются на сайтах
+белорусских магазинов (tests/test_prices.py, python -m benchmarks.prices)
+"""
+
+# (текст цены, ожидаемое значение); 0.0 - цена не разбирается
+PRICE_CORPUS = [
+    ("2,99 р.", 2.99),
+    ("2.99 р.", 2.99),
+    ("2,99 руб.", 2.99),
+    ("2,99 BYN", 2.99),
+    ("BYN 2.99", 2.99),
+    ("2,99", 2.99),
+    ("0,89 р.", 0.89),
+    ("15 р.", 15.0),
+    ("от 15 руб.", 15.0),
+    ("Цена: 4,50 р./кг", 4.5),
+    ("3,5 р.", 3.5),
+    ("1 234,56 р.", 1234.56),
+    ("1 234,56 р.", 1234.56),
+    ("1 234,56 BYN", 1234.56),
+    ("12 500 р.", 12500.0),
+    ("1 299 р.", 1299.0),
+    ("1.234,56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("1.234.567,00", 1234567.0),
+    ("1’234.50", 1234.5),
+    ("1.299", 1299.0),
+    ("2 р. 99 к.", 2.99),
+    ("2 руб. 5 коп.", 2.05),
+    ("12руб 50коп", 12.5),
+    ("2,99 р. за 1 шт", 2.99),
+    ("2,99 1 шт", 2.99),
+    ("  7,00 р.  ", 7.0),
+    ("р.", 0.0),
+    ("", 0.0),
+    (None, 0.0),
+    ("Нет в наличии", 0.0),
+]
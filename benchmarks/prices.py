@@ -0,0 +1,89 @@
+"""
+Корпус цен BYN и бенчмарк разбора цен
+
+Проверяет prices.parse_price / parse_prices на корпусе цен из
+price_corpus.py (записи цен в том виде, в каком они встречаются на
+сайтах белорусских магазинов) и сравнивает скорость с прежним разбором
+(re.sub без компиляции на каждую цену).
+
+Использование:
+    python -m benchmarks.prices                 # проверка корпуса и замер
+    python -m benchmarks.prices --batch 100000
+"""
+
+import re
+import sys
+import time
+import argparse
+from typing import Callable, List, Optional
+
+from src.scrapers.prices import parse_price, parse_prices
+from benchmarks.price_corpus import PRICE_CORPUS
+
+
+def legacy_parse_price(price_text: Optional[str]) -> float:
+    """Прежний разбор цены из SpecScraper"""
+    try:
+        price_str = re.sub(r'[^\d.,]', '', price_text)
+        price_str = price_str.replace(',', '.')
+        return float(price_str) if price_str else 0
+    except (ValueError, TypeError):
+        return 0
+
+
+def check_corpus(parse: Callable[[Optional[str]], float]) -> List[str]:
+    """Расхождения с ожидаемыми значениями корпуса"""
+    errors = []
+    for text, expected in PRICE_CORPUS:
+        value = parse(text)
+        if abs(value - expected) > 1e-9:
+            errors.append(f"{text!r}: {value} (ожидается {expected})")
+    return errors
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--batch', type=int, default=10000, help="Цен в пакете")
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+    
+    errors = check_corpus(parse_price)
+    batch_errors = [
+        f"{text!r}: {value} (ожидается {expected})"
+        for (text, expected), value in zip(PRICE_CORPUS, parse_prices([text for text, _ in PRICE_CORPUS]))
+        if abs(value - expected) > 1e-9
+    ]
+    legacy_errors = check_corpus(legacy_parse_price)
+    print(f"Корпус: {len(PRICE_CORPUS)} цен; ошибок parse_price {len(errors)}, "
+          f"parse_prices {len(batch_errors)}, прежний разбор {len(legacy_errors)}")
+    for line in errors + batch_errors:
+        print(f"  {line}")
+    
+    texts = [text for text, _ in PRICE_CORPUS if text]
+    batch = (texts * (args.batch // len(texts) + 1))[:args.batch]
+    
+    print(f"\nПакет {len(batch)} цен")
+    print(f"{'способ':<24}{'время, мс':>12}{'цен/с':>14}")
+    rows = [
+        ("прежний re.sub", lambda: [legacy_parse_price(text) for text in batch]),
+        ("parse_price", lambda: [parse_price(text) for text in batch]),
+        ("parse_prices", lambda: parse_prices(batch)),
+    ]
+    for name, func in rows:
+        elapsed = measure(func, args.repeat)
+        print(f"{name:<24}{elapsed * 1000:>12.1f}{len(batch) / elapsed:>14.0f}")
+    
+    return 1 if errors or batch_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
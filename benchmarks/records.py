@@ -0,0 +1,116 @@
+"""
+Бенчмарк памяти записей скидок: словари против DiscountRecord
+
+Строит одинаковый набор скидок (по умолчанию 100 000) словарями, как раньше
+делали скраперы, и кортежами DiscountRecord, и сравнивает удерживаемую
+память (tracemalloc) и время построения. Строки полей (названия, ссылки)
+у обоих вариантов общие, поэтому разница - это сами контейнеры.
+
+Использование:
+    python -m benchmarks.records
+    python -m benchmarks.records --items 500000
+"""
+
+import os
+import gc
+import time
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+os.environ.setdefault('BOT_TOKEN', 'benchmark')
+
+from src.database.records import DiscountRecord
+
+STORES = (("Евроопт", "grocery"), ("Green", "grocery"), ("21vek", "electronics"), ("Mile", "clothes"))
+
+
+def source_fields(count: int) -> List[Tuple]:
+    """Значения полей скидок"""
+    valid_until = datetime.now() + timedelta(days=7)
+    fields = []
+    for index in range(count):
+        store_name, category = STORES[index % len(STORES)]
+        fields.append((
+            f"Товар со скидкой №{index}",
+            12.99 + index % 100,
+            9.99 + index % 100,
+            23,
+            f"https://example.by/img/{index}.jpg",
+            f"https://example.by/product/{index}",
+            valid_until,
+            store_name,
+            category,
+            f"{index:032x}"
+        ))
+    return fields
+
+
+def build_dicts(fields: List[Tuple]) -> list:
+    """Прежний формат: словарь на каждую скидку"""
+    return [
+        {
+            'title': title,
+            'old_price': old_price,
+            'new_price': new_price,
+            'discount_percent': percent,
+            'image_url': image_url,
+            'product_url': product_url,
+            'valid_until': valid_until,
+            'store_name': store_name,
+            'category': category,
+            'fingerprint': fingerprint
+        }
+        for title, old_price, new_price, percent, image_url, product_url,
+        valid_until, store_name, category, fingerprint in fields
+    ]
+
+
+def build_records(fields: List[Tuple]) -> list:
+    """Новый формат: DiscountRecord на каждую скидку"""
+    return [
+        DiscountRecord(
+            title, old_price, new_price, percent, image_url, product_url,
+            valid_until, store_name, category, fingerprint
+        )
+        for title, old_price, new_price, percent, image_url, product_url,
+        valid_until, store_name, category, fingerprint in fields
+    ]
+
+
+def measure(build: Callable[[List[Tuple]], list], fields: List[Tuple]) -> Tuple[float, float]:
+    """Удерживаемая память (МБ) и время построения (сек)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    items = build(fields)
+    elapsed = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return retained / (1024 * 1024), elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--items', type=int, default=100_000, help="Количество скидок")
+    args = arg_parser.parse_args()
+    
+    fields = source_fields(args.items)
+    print(f"Скидок: {args.items}")
+    print(f"{'формат':<16}{'память, МБ':>12}{'байт/скидку':>14}{'время, мс':>12}")
+    
+    results = {}
+    for name, build in (('dict', build_dicts), ('DiscountRecord', build_records)):
+        retained, elapsed = measure(build, fields)
+        results[name] = retained
+        per_item = retained * 1024 * 1024 / args.items
+        print(f"{name:<16}{retained:>12.1f}{per_item:>14.0f}{elapsed * 1000:>12.1f}")
+    
+    if results['DiscountRecord']:
+        print(f"\nЭкономия: {results['dict'] / results['DiscountRecord']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
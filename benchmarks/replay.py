@@ -0,0 +1,93 @@
+"""
+Офлайн прогон полного цикла скрапинга на записанных HTTP ответах
+
+Запись фикстур с реальных сайтов (один раз, нужна сеть):
+    python -m benchmarks.replay --record
+
+Воспроизведение: загрузка, разбор, запись в БД и построение топа без сети,
+с необязательной задержкой и случайными ошибками ответов:
+    python -m benchmarks.replay --latency 0.2 --error-rate 0.05 --seed 1
+
+Прогон идет на временной базе; каталог фикстур - HTTP_FIXTURES_DIR
+или --fixtures.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--record', action='store_true', help="Записать ответы реальных сайтов")
+    arg_parser.add_argument('--fixtures', help="Каталог фикстур")
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="Задержка ответа, сек")
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help="Доля ошибок (0..1)")
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--runs', type=int, default=1, help="Количество прогонов подряд")
+    arg_parser.add_argument('--keep-rate-limit', action='store_true',
+                            help="Не отключать ограничение частоты запросов при воспроизведении")
+    return arg_parser.parse_args()
+
+
+def configure(args, database_path: Path):
+    """Настройки задаются окружением до первого импорта config.settings"""
+    os.environ.setdefault('BOT_TOKEN', 'benchmark')
+    os.environ['DATABASE_URL'] = f"sqlite+aiosqlite:///{database_path}"
+    os.environ['HTTP_FIXTURES_MODE'] = 'record' if args.record else 'replay'
+    if args.fixtures:
+        os.environ['HTTP_FIXTURES_DIR'] = str(Path(args.fixtures).resolve())
+    if not args.record:
+        os.environ['HTTP_CACHE_ENABLED'] = 'False'
+        os.environ['HTTP_REPLAY_LATENCY'] = str(args.latency)
+        os.environ['HTTP_REPLAY_ERROR_RATE'] = str(args.error_rate)
+        # Без сети повторы не должны ждать реальных интервалов
+        os.environ.setdefault('HTTP_BACKOFF_BASE', '0.01')
+        if not args.keep_rate_limit:
+            os.environ['HTTP_RATE_PER_HOST'] = '0'
+
+
+async def run(args) -> int:
+    from src.database.models import init_db
+    from src.scrapers import DiscountScraper
+    from src.scrapers.fixtures import ReplayHttpClient
+    
+    await init_db()
+    scraper = DiscountScraper()
+    if isinstance(scraper.http_client, ReplayHttpClient):
+        # Воспроизводимые задержки и ошибки
+        scraper.http_client = ReplayHttpClient(seed=args.seed)
+        for store_scraper in scraper.scrapers:
+            store_scraper.http_client = scraper.http_client
+    
+    try:
+        for number in range(1, args.runs + 1):
+            started = time.perf_counter()
+            saved = await scraper.update_all_discounts()
+            elapsed = time.perf_counter() - started
+            
+            print(f"\nПрогон {number}: сохранено {saved} скидок за {elapsed:.2f} с")
+            client = scraper.http_client
+            if isinstance(client, ReplayHttpClient):
+                print(f"Запросов: {client.requests}, без фикстуры: {client.missing}")
+            for store_name, duration in sorted(scraper.last_run_durations.items()):
+                print(f"  {store_name:<20}{duration:>8.2f} с")
+    finally:
+        await scraper.close()
+    
+    return 0
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(args, Path(tmp) / "replay.db")
+        sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
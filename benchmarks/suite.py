@@ -0,0 +1,383 @@
+"""
+Сквозной бенчмарк скрапинга: пропускная способность, память, запись в БД
+
+Для каждого размера каталога (по умолчанию 100 - 100 000 карточек) в
+отдельном процессе на временной базе замеряются:
+    scrape_s      - загрузка и разбор всех страниц SpecScraper (без БД)
+    cards_per_s   - карточек в секунду при разборе
+    db_write_s    - запись всех скидок пакетами save_discounts_bulk
+    pipeline_s    - полный DiscountScraper.update_all_discounts
+    peak_rss_mb   - пиковая память основного процесса
+    parse_rss_mb  - пиковая память процесса пула парсинга (наибольшая из
+                    PARSE_WORKERS; 0 - парсинг в основном процессе)
+    reference_s   - эталонная нагрузка: разбор одной страницы из PAGE_SIZE
+                    карточек в основном процессе
+Страницы синтетические (benchmarks/pages.py) и отдаются без сети. Пул
+процессов парсинга запускается до замеров.
+С --stores дополнительно прогоняются скраперы всех включенных магазинов
+на записанных фикстурах (см. benchmarks/replay.py).
+
+Результаты сравниваются с сохраненными в baselines.json: ухудшение больше
+порога (--threshold, по умолчанию 25%) считается регрессией, код выхода 1.
+Время сравнивается в единицах reference_s того же замера, поэтому базовые
+значения, сохраненные на другой машине или при другой нагрузке, не дают
+ложных регрессий; память сравнивается как есть. Каждый размер замеряется
+--repeat раз (не меньше MIN_REPEAT), берется лучший результат.
+
+Использование:
+    python -m benchmarks.suite                        # замер и сравнение
+    python -m benchmarks.suite --sizes 100,1000 --save-baseline
+    python -m benchmarks.suite --stores --fixtures data/fixtures
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASELINES_FILE = Path(__file__).with_name("baselines.json")
+
+DEFAULT_SIZES = "100,1000,10000,100000"
+PAGE_SIZE = 500
+
+# Метрики, у которых больше - хуже; у cards_per_s хуже - меньше
+LOWER_IS_BETTER = ('scrape_s', 'db_write_s', 'pipeline_s', 'peak_rss_mb', 'parse_rss_mb')
+HIGHER_IS_BETTER = ('cards_per_s',)
+# Метрики времени: сравниваются относительно reference_s
+TIMED = ('scrape_s', 'db_write_s', 'pipeline_s', 'cards_per_s')
+# Абсолютный разброс, меньше которого изменение не считается регрессией
+NOISE_FLOOR = {
+    'scrape_s': 0.05, 'db_write_s': 0.05, 'pipeline_s': 0.05, 'peak_rss_mb': 5.0, 'parse_rss_mb': 5.0
+}
+# Меньше повторов - лучший результат слишком зависит от случайных помех
+MIN_REPEAT = 3
+# Повторы эталонной нагрузки (берется лучший)
+REFERENCE_REPEAT = 5
+
+BENCH_STORE = {
+    "name": "Бенчмарк",
+    "category": "grocery",
+    "base_url": "http://bench.local",
+    "urls": ["/sale/"],
+    "cities": "all",
+    "card": ".product-card",
+    "fields": {
+        "title": ".product-title",
+        "old_price": ".old-price",
+        "new_price": ".new-price",
+        "image": "img",
+        "link": "a"
+    },
+    "page_param": "page"
+}
+
+
+def configure(workdir: Path, total_cards: int, page_size: int):
+    """Настройки окружения до первого импорта config.settings"""
+    os.environ.setdefault('BOT_TOKEN', 'benchmark')
+    os.environ['DATABASE_URL'] = f"sqlite+aiosqlite:///{workdir / 'bench.db'}"
+    os.environ['HTTP_CACHE_ENABLED'] = 'False'
+    os.environ['HTTP_RATE_PER_HOST'] = '0'
+    os.environ['SCRAPE_STORE_TIMEOUT'] = '3600'
+    
+    store = dict(BENCH_STORE, max_pages=total_cards // page_size + 2)
+    stores_file = workdir / 'stores.json'
+    stores_file.write_text(json.dumps([store], ensure_ascii=False), encoding='utf-8')
+    os.environ['STORES_FILE'] = str(stores_file)
+
+
+def synthetic_client(total_cards: int, page_size: int):
+    """HTTP клиент, отдающий каталог из total_cards карточек по page_size на страницу"""
+    from multidict import CIMultiDict
+    from src.scrapers.http_client import HttpClient, HttpResponse
+    from benchmarks.pages import synthetic_page
+    
+    class SyntheticHttpClient(HttpClient):
+        async def _send(self, url, headers):
+            match = re.search(r'[?&]page=(\d+)', url)
+            number = int(match.group(1)) if match else 1
+            first = (number - 1) * page_size
+            cards = max(0, min(page_size, total_cards - first))
+            html = synthetic_page(cards, seed=number, currency='BYN', first_id=first)
+            return HttpResponse(200, html, CIMultiDict({'Content-Type': 'text/html; charset=utf-8'}))
+    
+    client = SyntheticHttpClient()
+    client.cache = None
+    return client
+
+
+def measure_reference(scraper, page_size: int) -> float:
+    """Эталонная нагрузка (сек): разбор страницы из page_size карточек в текущем процессе"""
+    from config.settings import settings
+    from src.scrapers.parsing import extract_page
+    from benchmarks.pages import synthetic_page
+    
+    html = synthetic_page(page_size, seed=0, currency='BYN')
+    best = float('inf')
+    for _ in range(REFERENCE_REPEAT):
+        started = time.perf_counter()
+        extract_page(html, scraper.spec.card, scraper._fields, settings.HTML_PARSER, None)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def warm_parse_pool(scraper):
+    """Запуск процессов пула парсинга (разовая стоимость процесса, а не разбора)"""
+    from config.settings import settings
+    from benchmarks.pages import synthetic_page
+    
+    html = synthetic_page(1, seed=0, currency='BYN')
+    await asyncio.gather(*(
+        scraper.extract_page(html, scraper.spec.card, scraper._fields)
+        for _ in range(max(1, settings.PARSE_WORKERS))
+    ))
+
+
+async def measure_size(total_cards: int, page_size: int) -> Dict[str, float]:
+    """Замеры для одного размера каталога (в текущем процессе)"""
+    from config.settings import settings
+    from src.database.models import init_db
+    from src.database.crud import resolve_store_id, save_discounts_bulk
+    from src.scrapers import DiscountScraper, SpecScraper, load_store_specs
+    
+    await init_db()
+    client = synthetic_client(total_cards, page_size)
+    spec = load_store_specs()[0]
+    reference_scraper = SpecScraper(spec)
+    reference_s = measure_reference(reference_scraper, page_size)
+    await warm_parse_pool(reference_scraper)
+    
+    # Полный цикл на пустой базе: загрузка, разбор, конвейер записи, топ
+    scraper = DiscountScraper()
+    for store_scraper in scraper.scrapers:
+        store_scraper.http_client = client
+    started = time.perf_counter()
+    await scraper.update_all_discounts()
+    pipeline_s = time.perf_counter() - started
+    
+    # Только загрузка и разбор
+    spec_scraper = SpecScraper(spec)
+    spec_scraper.http_client = client
+    started = time.perf_counter()
+    discounts = [discount async for discount in spec_scraper.iter_discounts()]
+    scrape_s = time.perf_counter() - started
+    
+    # Только запись: отдельный магазин, чтобы не совпасть с записанными скидками
+    store_id = await resolve_store_id(f"{spec.name} (запись)", spec.category, spec.base_url)
+    batch_size = settings.INGEST_BATCH_SIZE
+    started = time.perf_counter()
+    for start in range(0, len(discounts), batch_size):
+        await save_discounts_bulk(store_id, discounts[start:start + batch_size])
+    db_write_s = time.perf_counter() - started
+    
+    # Закрытие останавливает пул парсинга: его процессы завершены и учтены в RUSAGE_CHILDREN
+    await scraper.close()
+    
+    return {
+        'cards': len(discounts),
+        'scrape_s': round(scrape_s, 4),
+        'cards_per_s': round(len(discounts) / scrape_s if scrape_s else 0.0, 1),
+        'db_write_s': round(db_write_s, 4),
+        'pipeline_s': round(pipeline_s, 4),
+        # ru_maxrss в Linux - килобайты
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'parse_rss_mb': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)
+        if settings.PARSE_WORKERS > 0 else 0.0,
+        'reference_s': round(reference_s, 4),
+    }
+
+
+async def measure_stores() -> List[Dict[str, object]]:
+    """Скраперы всех включенных магазинов на записанных фикстурах"""
+    from src.scrapers import SpecScraper, load_store_specs
+    from src.scrapers.fixtures import ReplayHttpClient
+    
+    client = ReplayHttpClient(seed=0)
+    results = []
+    for spec in load_store_specs():
+        if not spec.enabled:
+            continue
+        scraper = SpecScraper(spec)
+        scraper.http_client = client
+        started = time.perf_counter()
+        cards = sum([1 async for _ in scraper.iter_discounts()])
+        elapsed = time.perf_counter() - started
+        results.append({
+            'store': spec.name,
+            'cards': cards,
+            'scrape_s': round(elapsed, 4),
+            'cards_per_s': round(cards / elapsed if elapsed else 0.0, 1),
+        })
+    return results
+
+
+def run_worker(args) -> int:
+    """Замер одного размера; результат - JSON в последней строке вывода"""
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.stores_worker:
+            os.environ.setdefault('BOT_TOKEN', 'benchmark')
+            os.environ['HTTP_CACHE_ENABLED'] = 'False'
+            os.environ['HTTP_RATE_PER_HOST'] = '0'
+            if args.fixtures:
+                os.environ['HTTP_FIXTURES_DIR'] = str(Path(args.fixtures).resolve())
+            result = asyncio.run(measure_stores())
+        else:
+            configure(Path(tmp), args.worker, args.page_size)
+            result = asyncio.run(measure_size(args.worker, args.page_size))
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+def spawn(extra: List[str]) -> object:
+    """Запуск замера в отдельном процессе (чистая память и база)"""
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.suite', *extra],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def relative(metrics: Dict[str, float]) -> Dict[str, float]:
+    """Метрики времени в единицах эталонной нагрузки того же замера"""
+    reference = metrics['reference_s']
+    return {
+        name: round(metrics[name] * reference if name in HIGHER_IS_BETTER else metrics[name] / reference, 4)
+        for name in TIMED
+    }
+
+
+def best_of(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    """Лучшее значение каждой метрики (и относительного времени) по нескольким повторам"""
+    best = dict(runs[0])
+    best['relative'] = relative(runs[0])
+    for run in runs[1:]:
+        run_relative = relative(run)
+        for name in LOWER_IS_BETTER:
+            best[name] = min(best[name], run[name])
+            if name in TIMED:
+                best['relative'][name] = min(best['relative'][name], run_relative[name])
+        for name in HIGHER_IS_BETTER:
+            best[name] = max(best[name], run[name])
+            best['relative'][name] = max(best['relative'][name], run_relative[name])
+    best['reference_s'] = min(run['reference_s'] for run in runs)
+    return best
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baselines: Dict[str, Dict[str, float]],
+    threshold: float
+) -> List[str]:
+    """
+    Метрики, ухудшившиеся относительно базовых больше чем на threshold
+    
+    Время сравнивается в единицах эталонной нагрузки (см. relative);
+    базовые значения без них (старый формат) по времени не сравниваются.
+    """
+    regressions = []
+    for size, metrics in results.items():
+        baseline = baselines.get(size)
+        if not baseline:
+            continue
+        current = dict(metrics, **metrics['relative'])
+        base = dict(baseline, **baseline.get('relative', {}))
+        if 'relative' not in baseline:
+            base = {name: value for name, value in base.items() if name not in TIMED}
+        for name in LOWER_IS_BETTER:
+            if not base.get(name):
+                continue
+            # Разница в секундах (МБ) текущего замера: мелкая - шум
+            scale = metrics['reference_s'] if name in TIMED else 1
+            if (current[name] - base[name]) * scale < NOISE_FLOOR[name]:
+                continue
+            if current[name] > base[name] * (1 + threshold):
+                regressions.append(f"{size}: {name} {base[name]} -> {current[name]}")
+        for name in HIGHER_IS_BETTER:
+            if metrics['scrape_s'] < NOISE_FLOOR['scrape_s']:
+                continue
+            if base.get(name) and current[name] < base[name] / (1 + threshold):
+                regressions.append(f"{size}: {name} {base[name]} -> {current[name]}")
+    return regressions
+
+
+def print_table(results: Dict[str, Dict[str, float]], baselines: Dict[str, Dict[str, float]]):
+    print(f"{'карточек':>10}{'разбор, с':>12}{'карт/с':>10}{'запись, с':>12}"
+          f"{'цикл, с':>10}{'RSS, МБ':>10}{'RSS пула':>10}{'эталон, мс':>12}{'база карт/с':>14}")
+    for size, metrics in results.items():
+        baseline = baselines.get(size, {})
+        print(f"{metrics['cards']:>10}{metrics['scrape_s']:>12.3f}{metrics['cards_per_s']:>10.0f}"
+              f"{metrics['db_write_s']:>12.3f}{metrics['pipeline_s']:>10.3f}"
+              f"{metrics['peak_rss_mb']:>10.1f}{metrics['parse_rss_mb']:>10.1f}"
+              f"{metrics['reference_s'] * 1000:>12.1f}"
+              f"{baseline.get('cards_per_s', '-'):>14}")
+
+
+def load_baselines() -> Dict[str, Dict[str, float]]:
+    if not BASELINES_FILE.exists():
+        return {}
+    return json.loads(BASELINES_FILE.read_text(encoding='utf-8'))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Размеры каталога (карточек)")
+    arg_parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help="Карточек на странице")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Повторов на размер (берется лучший)")
+    arg_parser.add_argument('--threshold', type=float, default=0.25, help="Допустимое ухудшение (доля)")
+    arg_parser.add_argument('--save-baseline', action='store_true', help="Сохранить результаты как базовые")
+    arg_parser.add_argument('--stores', action='store_true', help="Скраперы магазинов на фикстурах")
+    arg_parser.add_argument('--fixtures', help="Каталог фикстур")
+    arg_parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    arg_parser.add_argument('--stores-worker', action='store_true', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+    
+    if args.worker is not None or args.stores_worker:
+        return run_worker(args)
+    if args.repeat < MIN_REPEAT:
+        arg_parser.error(f"--repeat должен быть не меньше {MIN_REPEAT}")
+    
+    if args.stores:
+        extra = ['--stores-worker'] + (['--fixtures', args.fixtures] if args.fixtures else [])
+        print(f"{'магазин':<20}{'карточек':>10}{'разбор, с':>12}{'карт/с':>10}")
+        for row in spawn(extra):
+            print(f"{row['store']:<20}{row['cards']:>10}{row['scrape_s']:>12.3f}{row['cards_per_s']:>10.0f}")
+        return 0
+    
+    results = {}
+    for size in (int(value) for value in args.sizes.split(',')):
+        runs = [
+            spawn(['--worker', str(size), '--page-size', str(args.page_size)])
+            for _ in range(args.repeat)
+        ]
+        results[str(size)] = best_of(runs)
+    
+    baselines = load_baselines()
+    print_table(results, baselines)
+    
+    if args.save_baseline:
+        baselines.update(results)
+        BASELINES_FILE.write_text(
+            json.dumps(baselines, ensure_ascii=False, indent=2) + "\n", encoding='utf-8'
+        )
+        print(f"\nБазовые значения сохранены в {BASELINES_FILE}")
+        return 0
+    
+    regressions = compare(results, baselines, args.threshold)
+    if regressions:
+        print(f"\nРегрессии (порог {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
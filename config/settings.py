@@ -1,63 +1,149 @@
-"""
-Конфигурация приложения
-"""
-
-import os
-from pathlib import Path
-from dataclasses import dataclass
-from dotenv import load_dotenv
-
-# Загрузка переменных окружения из .env файла
-load_dotenv()
-
-# Базовая директория проекта
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-
-@dataclass
-class Settings:
-    """Настройки приложения"""
-    
-    # Telegram Bot
-    BOT_TOKEN: str = os.getenv("BOT_TOKEN", "")
-    
-    # Database
-    DATABASE_URL: str = os.getenv(
-        "DATABASE_URL", 
-        f"sqlite+aiosqlite:///{BASE_DIR}/data/discount_bot.db"
-    )
-    
-    # Debug mode
-    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
-    
-    # Scraping settings
-    SCRAPE_INTERVAL_HOURS: int = int(os.getenv("SCRAPE_INTERVAL_HOURS", "24"))
-    REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "30"))
-    
-    # Cities
-    SUPPORTED_CITIES: list = None
-    
-    # Categories
-    SUPPORTED_CATEGORIES: list = None
-    
-    def __post_init__(self):
-        # Областные центры и крупные города Беларуси
-        self.SUPPORTED_CITIES = [
-            # Областные центры
-            "Минск", "Брест", "Витебск", "Гомель", "Гродно", "Могилёв",
-            # Крупные города
-            "Бобруйск", "Барановичи", "Борисов", "Пинск", "Орша", "Мозырь",
-            "Солигорск", "Новополоцк", "Лида", "Молодечно", "Полоцк", "Жлобин",
-            "Светлогорск", "Речица", "Слуцк", "Жодино", "Кобрин", "Слоним",
-            "Волковыск", "Калинковичи", "Сморгонь", "Рогачёв", "Осиповичи",
-            "Горки", "Новогрудок", "Берёза", "Марьина Горка", "Вилейка",
-            "Мосты", "Дзержинск", "Лунинец", "Столбцы", "Глубокое", "Несвиж"
-        ]
-        self.SUPPORTED_CATEGORIES = ["grocery", "clothing", "electronics", "home"]
-        
-        if not self.BOT_TOKEN:
-            raise ValueError("BOT_TOKEN environment variable is required")
-
-
-# Создаем экземпляр настроек
-settings = Settings()
+"""
+Конфигурация приложения
+"""
+
+import os
+from pathlib import Path
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+# Загрузка переменных окружения из .env файла
+load_dotenv()
+
+# Базовая директория проекта
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Settings:
+    """Настройки приложения"""
+    
+    # Telegram Bot
+    BOT_TOKEN: str = os.getenv("BOT_TOKEN", "")
+    
+    # Database
+    DATABASE_URL: str = os.getenv(
+        "DATABASE_URL", 
+        f"sqlite+aiosqlite:///{BASE_DIR}/data/discount_bot.db"
+    )
+    
+    # SQLite: профиль производительности (WAL, pragma) и пул читающих соединений
+    SQLITE_WAL: bool = os.getenv("SQLITE_WAL", "True").lower() == "true"
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    DB_READ_POOL_SIZE: int = int(os.getenv("DB_READ_POOL_SIZE", "5"))
+    
+    # Кэш результатов запросов скидок (количество запросов)
+    QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+    # Период проверки записей скидок другими процессами для сброса кэша (сек)
+    QUERY_CACHE_SYNC_SECONDS: int = int(os.getenv("QUERY_CACHE_SYNC_SECONDS", "15"))
+    
+    # Размер предрасчитанного топа скидок (на город, город+категорию, магазин)
+    LEADERBOARD_SIZE: int = int(os.getenv("LEADERBOARD_SIZE", "50"))
+    
+    # Debug mode
+    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    
+    # Scraping settings
+    # Описания магазинов для SpecScraper (адреса, селекторы, города)
+    STORES_FILE: str = os.getenv("STORES_FILE", str(BASE_DIR / "config" / "stores.json"))
+    # Интервал обновления магазина без истории; с историей он адаптируется
+    # в пределах MIN..MAX по частоте изменений магазина (src/scheduling.py)
+    SCRAPE_INTERVAL_HOURS: int = int(os.getenv("SCRAPE_INTERVAL_HOURS", "24"))
+    SCRAPE_MIN_INTERVAL_HOURS: float = float(os.getenv("SCRAPE_MIN_INTERVAL_HOURS", "2"))
+    SCRAPE_MAX_INTERVAL_HOURS: float = float(os.getenv("SCRAPE_MAX_INTERVAL_HOURS", "48"))
+    # Случайный сдвиг запусков магазинов (сек) и глубина истории заданий
+    SCRAPE_JITTER_SECONDS: int = int(os.getenv("SCRAPE_JITTER_SECONDS", "600"))
+    SCRAPE_HISTORY_SIZE: int = int(os.getenv("SCRAPE_HISTORY_SIZE", "10"))
+    REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "30"))
+    
+    # HTTP client (общий пул соединений для всех скраперов)
+    HTTP_POOL_LIMIT: int = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "4"))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "600"))
+    HTTP_KEEPALIVE_TIMEOUT: int = int(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    # Таймаут установки соединения: недоступный хост не занимает весь REQUEST_TIMEOUT
+    HTTP_CONNECT_TIMEOUT: int = int(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+    # Максимальный размер страницы после распаковки (байт), больше - загрузка прерывается
+    HTTP_MAX_PAGE_BYTES: int = int(os.getenv("HTTP_MAX_PAGE_BYTES", str(10 * 1024 * 1024)))
+    
+    # Частота запросов к одному хосту (запросов в секунду, 0 - без ограничения)
+    HTTP_RATE_PER_HOST: float = float(os.getenv("HTTP_RATE_PER_HOST", "2"))
+    HTTP_RATE_BURST: int = int(os.getenv("HTTP_RATE_BURST", "4"))
+    # Повторы при ошибках сети и ответах 429/5xx (задержка растет экспоненциально)
+    HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", "3"))
+    HTTP_BACKOFF_BASE: float = float(os.getenv("HTTP_BACKOFF_BASE", "1"))
+    HTTP_BACKOFF_MAX: float = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+    # Предохранитель: после N неудачных попыток подряд хост пропускается на M секунд
+    HTTP_CIRCUIT_THRESHOLD: int = int(os.getenv("HTTP_CIRCUIT_THRESHOLD", "5"))
+    HTTP_CIRCUIT_RESET: int = int(os.getenv("HTTP_CIRCUIT_RESET", "300"))
+    
+    # Фикстуры HTTP ответов: "record" - запись, "replay" - офлайн воспроизведение
+    HTTP_FIXTURES_MODE: str = os.getenv("HTTP_FIXTURES_MODE", "")
+    HTTP_FIXTURES_DIR: str = os.getenv("HTTP_FIXTURES_DIR", str(BASE_DIR / "data" / "fixtures"))
+    # Задержка (сек) и доля ошибок, вносимые при воспроизведении
+    HTTP_REPLAY_LATENCY: float = float(os.getenv("HTTP_REPLAY_LATENCY", "0"))
+    HTTP_REPLAY_ERROR_RATE: float = float(os.getenv("HTTP_REPLAY_ERROR_RATE", "0"))
+    
+    # Дисковый кэш страниц с условными запросами (ETag / Last-Modified)
+    HTTP_CACHE_ENABLED: bool = os.getenv("HTTP_CACHE_ENABLED", "True").lower() == "true"
+    HTTP_CACHE_DIR: str = os.getenv("HTTP_CACHE_DIR", str(BASE_DIR / "data" / "http_cache"))
+    HTTP_CACHE_MAX_MB: int = int(os.getenv("HTTP_CACHE_MAX_MB", "200"))
+    
+    # Параллельный скрапинг магазинов
+    SCRAPE_CONCURRENT: bool = os.getenv("SCRAPE_CONCURRENT", "True").lower() == "true"
+    SCRAPE_MAX_CONCURRENCY: int = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "8"))
+    SCRAPE_MAX_CONCURRENCY_PER_HOST: int = int(os.getenv("SCRAPE_MAX_CONCURRENCY_PER_HOST", "1"))
+    SCRAPE_STORE_TIMEOUT: int = int(os.getenv("SCRAPE_STORE_TIMEOUT", "120"))
+    
+    # Пул процессов для парсинга HTML (0 - парсинг в основном процессе)
+    PARSE_WORKERS: int = int(os.getenv("PARSE_WORKERS", "2"))
+    # Бэкенд парсинга по умолчанию: html.parser, lxml, lxml-partial
+    HTML_PARSER: str = os.getenv("HTML_PARSER", "lxml-partial")
+    
+    # Очередь заданий скрапинга и процессы-обработчики (python -m src.worker)
+    SCRAPE_WORKERS: int = int(os.getenv("SCRAPE_WORKERS", "1"))
+    # Пауза между проверками пустой очереди (сек)
+    SCRAPE_JOB_POLL_INTERVAL: float = float(os.getenv("SCRAPE_JOB_POLL_INTERVAL", "5"))
+    # Срок взятого задания (сек): продлевается, пока обработчик жив
+    SCRAPE_JOB_LEASE: int = int(os.getenv("SCRAPE_JOB_LEASE", "600"))
+    SCRAPE_JOB_MAX_ATTEMPTS: int = int(os.getenv("SCRAPE_JOB_MAX_ATTEMPTS", "3"))
+    # Сколько дней хранить завершенные задания
+    SCRAPE_JOB_KEEP_DAYS: int = int(os.getenv("SCRAPE_JOB_KEEP_DAYS", "7"))
+    
+    # Конвейер записи скидок в БД
+    INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", "2000"))
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+    
+    # Cities
+    SUPPORTED_CITIES: list = None
+    
+    # Categories
+    SUPPORTED_CATEGORIES: list = None
+    
+    def __post_init__(self):
+        # Областные центры и крупные города Беларуси
+        self.SUPPORTED_CITIES = [
+            # Областные центры
+            "Минск", "Брест", "Витебск", "Гомель", "Гродно", "Могилёв",
+            # Крупные города
+            "Бобруйск", "Барановичи", "Борисов", "Пинск", "Орша", "Мозырь",
+            "Солигорск", "Новополоцк", "Лида", "Молодечно", "Полоцк", "Жлобин",
+            "Светлогорск", "Речица", "Слуцк", "Жодино", "Кобрин", "Слоним",
+            "Волковыск", "Калинковичи", "Сморгонь", "Рогачёв", "Осиповичи",
+            "Горки", "Новогрудок", "Берёза", "Марьина Горка", "Вилейка",
+            "Мосты", "Дзержинск", "Лунинец", "Столбцы", "Глубокое", "Несвиж"
+        ]
+        self.SUPPORTED_CATEGORIES = ["grocery", "clothing", "electronics", "home"]
+        
+        if not self.BOT_TOKEN:
+            raise ValueError("BOT_TOKEN environment variable is required")
+        # Интервалы магазинов строятся в геометрической шкале от минимума
+        if self.SCRAPE_MIN_INTERVAL_HOURS <= 0:
+            raise ValueError("SCRAPE_MIN_INTERVAL_HOURS must be greater than 0")
+
+
+# Создаем экземпляр настроек
+settings = Settings()
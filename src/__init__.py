@@ -1 +1 @@
-"""Telegram Discount Bot - Source Package"""
+"""Telegram Discount Bot - Source Package"""
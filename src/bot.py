@@ -1,79 +1,164 @@
-"""
-Основной модуль бота
-"""
-
-import asyncio
-import logging
-from aiogram import Bot, Dispatcher
-from aiogram.enums import ParseMode
-from aiogram.client.default import DefaultBotProperties
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-
-from src.handlers.commands import router as commands_router
-from src.handlers.callbacks import router as callbacks_router
-from src.database.models import init_db
-from src.scrapers import DiscountScraper
-
-logger = logging.getLogger(__name__)
-
-
-class DiscountBot:
-    """Главный класс Telegram бота для отслеживания скидок"""
-    
-    def __init__(self, token: str):
-        self.bot = Bot(
-            token=token,
-            default=DefaultBotProperties(parse_mode=ParseMode.HTML)
-        )
-        self.dp = Dispatcher()
-        self.scheduler = AsyncIOScheduler()
-        self.scraper = DiscountScraper()
-        
-        # Регистрация роутеров
-        self.dp.include_router(commands_router)
-        self.dp.include_router(callbacks_router)
-        
-    async def start(self):
-        """Запуск бота"""
-        logger.info("Инициализация базы данных...")
-        await init_db()
-        
-        logger.info("Настройка планировщика задач...")
-        self._setup_scheduler()
-        self.scheduler.start()
-        
-        logger.info("Запуск polling...")
-        await self.dp.start_polling(self.bot)
-        
-    async def stop(self):
-        """Остановка бота"""
-        logger.info("Остановка бота...")
-        self.scheduler.shutdown()
-        await self.bot.session.close()
-        
-    def _setup_scheduler(self):
-        """Настройка планировщика для ежедневного обновления скидок"""
-        # Обновление скидок каждый день в 6:00 утра
-        self.scheduler.add_job(
-            self._update_discounts,
-            'cron',
-            hour=6,
-            minute=0,
-            id='daily_discount_update'
-        )
-        
-        # Также запускаем обновление при старте
-        self.scheduler.add_job(
-            self._update_discounts,
-            'date',
-            id='startup_discount_update'
-        )
-        
-    async def _update_discounts(self):
-        """Обновление информации о скидках"""
-        logger.info("Начало обновления скидок...")
-        try:
-            await self.scraper.update_all_discounts()
-            logger.info("Скидки успешно обновлены")
-        except Exception as e:
-            logger.error(f"Ошибка при обновлении скидок: {e}")
+"""
+Основной модуль бота
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from aiogram import Bot, Dispatcher
+from aiogram.enums import ParseMode
+from aiogram.client.default import DefaultBotProperties
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from config.settings import settings
+from src.handlers.commands import router as commands_router
+from src.handlers.callbacks import router as callbacks_router
+from src.database.models import init_db, read_engine
+from src.database.store_registry import store_registry
+from src.database.query_cache import query_cache, DataVersionWatcher
+from src.database.job_queue import enqueue_scrape_jobs, get_scrape_history, get_finished_store_names
+from src.scrapers.specs import load_store_specs
+from src.scheduling import adaptive_interval, first_run_delay, describe
+
+logger = logging.getLogger(__name__)
+
+
+class DiscountBot:
+    """Главный класс Telegram бота для отслеживания скидок"""
+    
+    def __init__(self, token: str):
+        self.bot = Bot(
+            token=token,
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+        )
+        self.dp = Dispatcher()
+        self.scheduler = AsyncIOScheduler()
+        # Скидки записывают процессы-обработчики: кэш запросов сбрасывается по счетчику их записей
+        self.cache_watcher = DataVersionWatcher(read_engine, query_cache)
+        # Задания, выполненные позже этого момента, еще не учтены в расписании
+        self._schedule_synced_at = datetime.utcnow()
+        
+        # Регистрация роутеров
+        self.dp.include_router(commands_router)
+        self.dp.include_router(callbacks_router)
+    
+    async def start(self):
+        """Запуск бота"""
+        logger.info("Инициализация базы данных...")
+        await init_db()
+        await store_registry.warm()
+        
+        logger.info("Настройка планировщика задач...")
+        await self._setup_scheduler()
+        self.scheduler.start()
+        
+        logger.info("Запуск polling...")
+        await self.dp.start_polling(self.bot)
+    
+    async def stop(self):
+        """Остановка бота"""
+        logger.info("Остановка бота...")
+        self.scheduler.shutdown()
+        await self.cache_watcher.close()
+        await self.bot.session.close()
+    
+    async def _setup_scheduler(self):
+        """
+        Настройка планировщика: отдельное задание обновления для каждого магазина
+        
+        Бот только ставит задания в очередь, скрапинг выполняют
+        отдельные процессы: python -m src.worker. Интервал магазина
+        подстраивается под частоту его изменений (src/scheduling.py),
+        запуски разнесены случайным сдвигом.
+        """
+        names = [spec.name for spec in load_store_specs() if spec.enabled]
+        histories = await get_scrape_history(names)
+        now = datetime.now()
+        
+        for name in names:
+            history = histories[name]
+            interval = adaptive_interval(history)
+            self.scheduler.add_job(
+                self._update_store,
+                self._store_trigger(interval),
+                args=(name,),
+                id=self._store_job_id(name),
+                next_run_time=now + timedelta(seconds=first_run_delay(history, interval)),
+                # Пропущенные запуски (бот был занят или спал) выполняются один раз
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=None
+            )
+            logger.info(f"Обновление {name}: {describe(history, interval)}")
+        
+        # Сброс кэша запросов после записей обработчиков очереди
+        self.scheduler.add_job(
+            self._sync_query_cache,
+            'interval',
+            seconds=settings.QUERY_CACHE_SYNC_SECONDS,
+            id='query_cache_sync'
+        )
+        # Пересчет интервалов магазинов по результатам выполненных заданий
+        self.scheduler.add_job(
+            self._sync_store_schedules,
+            'interval',
+            seconds=settings.SCRAPE_JOB_POLL_INTERVAL,
+            id='scrape_schedule_sync'
+        )
+    
+    @staticmethod
+    def _store_job_id(store_name: str) -> str:
+        """ID задания планировщика для магазина"""
+        return f"scrape:{store_name}"
+    
+    @staticmethod
+    def _store_trigger(interval: timedelta) -> IntervalTrigger:
+        """Интервальный триггер магазина со случайным сдвигом запусков"""
+        return IntervalTrigger(seconds=interval.total_seconds(), jitter=settings.SCRAPE_JITTER_SECONDS)
+    
+    async def _update_store(self, store_name: str):
+        """Постановка задания обновления магазина"""
+        try:
+            if await enqueue_scrape_jobs([store_name]):
+                logger.info(f"Поставлено задание обновления скидок {store_name}")
+        except Exception as e:
+            logger.error(f"Ошибка постановки задания обновления {store_name}: {e}")
+    
+    async def _sync_store_schedules(self):
+        """
+        Пересчет интервалов магазинов, задания которых выполнены с прошлой проверки
+        
+        Интервал считается по истории уже с выполненным заданием, а следующий
+        запуск отсчитывается от его завершения.
+        """
+        checked_at = datetime.utcnow()
+        try:
+            names = await get_finished_store_names(self._schedule_synced_at)
+            histories = await get_scrape_history(names)
+        except Exception as e:
+            logger.error(f"Ошибка чтения истории заданий скрапинга: {e}")
+            return
+        self._schedule_synced_at = checked_at
+        
+        now = datetime.now()
+        for name, history in histories.items():
+            job = self.scheduler.get_job(self._store_job_id(name))
+            if job is None:
+                continue
+            previous = job.trigger.interval
+            interval = adaptive_interval(history)
+            job.modify(
+                trigger=self._store_trigger(interval),
+                next_run_time=now + timedelta(seconds=first_run_delay(history, interval))
+            )
+            # Мелкие колебания частоты изменений в журнал не пишутся
+            if abs(previous - interval) > previous * 0.1:
+                logger.info(f"Обновление {name}: {describe(history, interval)}")
+    
+    async def _sync_query_cache(self):
+        """Сброс кэша запросов после записи скидок обработчиками очереди"""
+        try:
+            await self.cache_watcher.check()
+        except Exception as e:
+            logger.error(f"Ошибка проверки изменений БД: {e}")
@@ -1,4 +1,13 @@
-"""Database Package"""
-from src.database.models import init_db, User, Store, Discount, Subscription
-
-__all__ = ['init_db', 'User', 'Store', 'Discount', 'Subscription']
+"""Database Package"""
+from src.database.models import (
+    init_db, User, Store, StoreCity, Discount, Subscription, LeaderboardEntry,
+    PageFingerprint, ScrapeJob, DataVersion
+)
+from src.database.records import DiscountRecord
+from src.database.store_registry import store_registry
+
+__all__ = [
+    'init_db', 'User', 'Store', 'StoreCity', 'Discount', 'Subscription',
+    'LeaderboardEntry', 'PageFingerprint', 'ScrapeJob', 'DataVersion',
+    'DiscountRecord', 'store_registry'
+]
@@ -1,309 +1,706 @@
-"""
-CRUD операции для базы данных
-"""
-
-from datetime import datetime
-from typing import Optional, List
-from sqlalchemy import select, update, delete, and_, desc
-from sqlalchemy.orm import selectinload
-
-from src.database.models import (
-    async_session,
-    User,
-    Store,
-    Discount,
-    Subscription
-)
-
-
-# ===================== USER OPERATIONS =====================
-
-async def get_or_create_user(
-    telegram_id: int,
-    username: Optional[str] = None,
-    first_name: Optional[str] = None
-) -> User:
-    """Получить или создать пользователя"""
-    async with async_session() as session:
-        # Попытка найти пользователя
-        result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if user:
-            # Обновляем информацию, если изменилась
-            if username and user.username != username:
-                user.username = username
-            if first_name and user.first_name != first_name:
-                user.first_name = first_name
-            await session.commit()
-            return user
-        
-        # Создаем нового пользователя
-        user = User(
-            telegram_id=telegram_id,
-            username=username,
-            first_name=first_name
-        )
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
-        return user
-
-
-async def update_user_city(telegram_id: int, city: str) -> Optional[User]:
-    """Обновить город пользователя"""
-    async with async_session() as session:
-        result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if user:
-            user.city = city
-            await session.commit()
-            await session.refresh(user)
-        
-        return user
-
-
-async def get_user_by_telegram_id(telegram_id: int) -> Optional[User]:
-    """Получить пользователя по Telegram ID"""
-    async with async_session() as session:
-        result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        return result.scalar_one_or_none()
-
-
-# ===================== STORE OPERATIONS =====================
-
-async def get_store_by_name(name: str) -> Optional[Store]:
-    """Получить магазин по имени"""
-    async with async_session() as session:
-        result = await session.execute(
-            select(Store).where(Store.name == name)
-        )
-        return result.scalar_one_or_none()
-
-
-async def create_store(
-    name: str,
-    category: str,
-    website: Optional[str] = None,
-    logo_url: Optional[str] = None,
-    description: Optional[str] = None
-) -> Store:
-    """Создать новый магазин"""
-    async with async_session() as session:
-        store = Store(
-            name=name,
-            category=category,
-            website=website,
-            logo_url=logo_url,
-            description=description
-        )
-        session.add(store)
-        await session.commit()
-        await session.refresh(store)
-        return store
-
-
-async def get_stores_by_category(category: str) -> List[Store]:
-    """Получить магазины по категории"""
-    async with async_session() as session:
-        result = await session.execute(
-            select(Store).where(Store.category == category)
-        )
-        return result.scalars().all()
-
-
-# ===================== DISCOUNT OPERATIONS =====================
-
-async def save_discount(
-    store_id: int,
-    title: str,
-    new_price: float,
-    old_price: Optional[float] = None,
-    discount_percent: Optional[int] = None,
-    image_url: Optional[str] = None,
-    product_url: Optional[str] = None,
-    valid_until: Optional[datetime] = None,
-    city: str = "Минск"
-) -> Discount:
-    """Сохранить скидку"""
-    async with async_session() as session:
-        # Проверяем, существует ли уже такая скидка
-        result = await session.execute(
-            select(Discount).where(
-                and_(
-                    Discount.store_id == store_id,
-                    Discount.title == title,
-                    Discount.is_active == True
-                )
-            )
-        )
-        existing = result.scalar_one_or_none()
-        
-        if existing:
-            # Обновляем существующую скидку
-            existing.old_price = old_price
-            existing.new_price = new_price
-            existing.discount_percent = discount_percent
-            existing.valid_until = valid_until
-            existing.updated_at = datetime.utcnow()
-            await session.commit()
-            await session.refresh(existing)
-            return existing
-        
-        # Создаем новую скидку
-        discount = Discount(
-            store_id=store_id,
-            title=title,
-            old_price=old_price,
-            new_price=new_price,
-            discount_percent=discount_percent,
-            image_url=image_url,
-            product_url=product_url,
-            valid_until=valid_until,
-            city=city
-        )
-        session.add(discount)
-        await session.commit()
-        await session.refresh(discount)
-        return discount
-
-
-async def get_discounts_by_category(
-    city: str,
-    category: str,
-    limit: int = 20
-) -> List[Discount]:
-    """Получить скидки по категории и городу"""
-    async with async_session() as session:
-        result = await session.execute(
-            select(Discount)
-            .join(Store)
-            .where(
-                and_(
-                    Store.category == category,
-                    Discount.city == city,
-                    Discount.is_active == True
-                )
-            )
-            .options(selectinload(Discount.store))
-            .order_by(desc(Discount.discount_percent))
-            .limit(limit)
-        )
-        return result.scalars().all()
-
-
-async def get_best_discounts(city: str, limit: int = 10) -> List[Discount]:
-    """Получить лучшие скидки по городу (сортировка по проценту скидки)"""
-    async with async_session() as session:
-        result = await session.execute(
-            select(Discount)
-            .where(
-                and_(
-                    Discount.city == city,
-                    Discount.is_active == True,
-                    Discount.discount_percent.isnot(None)
-                )
-            )
-            .options(selectinload(Discount.store))
-            .order_by(desc(Discount.discount_percent))
-            .limit(limit)
-        )
-        return result.scalars().all()
-
-
-async def deactivate_old_discounts():
-    """Деактивировать устаревшие скидки"""
-    async with async_session() as session:
-        await session.execute(
-            update(Discount)
-            .where(
-                and_(
-                    Discount.valid_until < datetime.utcnow(),
-                    Discount.is_active == True
-                )
-            )
-            .values(is_active=False)
-        )
-        await session.commit()
-
-
-# ===================== SUBSCRIPTION OPERATIONS =====================
-
-async def toggle_subscription(telegram_id: int, category: str) -> bool:
-    """Переключить подписку на категорию. Возвращает True если подписка активирована."""
-    async with async_session() as session:
-        # Получаем пользователя
-        user_result = await session.execute(
-            select(User).where(User.telegram_id == telegram_id)
-        )
-        user = user_result.scalar_one_or_none()
-        
-        if not user:
-            return False
-        
-        # Проверяем существующую подписку
-        sub_result = await session.execute(
-            select(Subscription).where(
-                and_(
-                    Subscription.user_id == user.id,
-                    Subscription.category == category
-                )
-            )
-        )
-        subscription = sub_result.scalar_one_or_none()
-        
-        if subscription:
-            # Переключаем статус
-            subscription.is_active = not subscription.is_active
-            await session.commit()
-            return subscription.is_active
-        else:
-            # Создаем новую подписку
-            subscription = Subscription(
-                user_id=user.id,
-                category=category,
-                is_active=True
-            )
-            session.add(subscription)
-            await session.commit()
-            return True
-
-
-async def get_user_subscriptions(telegram_id: int) -> List[Subscription]:
-    """Получить активные подписки пользователя"""
-    async with async_session() as session:
-        result = await session.execute(
-            select(Subscription)
-            .join(User)
-            .where(
-                and_(
-                    User.telegram_id == telegram_id,
-                    Subscription.is_active == True
-                )
-            )
-        )
-        return result.scalars().all()
-
-
-async def get_subscribers_by_category(category: str) -> List[User]:
-    """Получить всех подписчиков категории для рассылки"""
-    async with async_session() as session:
-        result = await session.execute(
-            select(User)
-            .join(Subscription)
-            .where(
-                and_(
-                    Subscription.category == category,
-                    Subscription.is_active == True,
-                    User.is_active == True
-                )
-            )
-        )
-        return result.scalars().all()
+"""
+CRUD операции для базы данных
+"""
+
+import heapq
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Union, Tuple, Set, Sequence
+from sqlalchemy import select, update, delete, and_, desc
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from config.settings import settings
+from src.database.models import (
+    async_session,
+    read_session,
+    User,
+    Store,
+    Discount,
+    Subscription,
+    StoreCity,
+    LeaderboardEntry,
+    PageFingerprint,
+    DataVersion,
+    ALL_CITIES,
+    DISCOUNTS_VERSION
+)
+from src.database.records import DiscountRecord
+from src.database.store_registry import store_registry
+from src.database.query_cache import query_cache
+
+# Размер порции отпечатков в одном UPDATE ... IN (лимит переменных SQLite)
+FINGERPRINT_CHUNK = 500
+
+
+async def _bump_discounts_version(session):
+    """
+    Увеличить счетчик изменений скидок в транзакции записи
+    
+    Другие процессы сбрасывают по нему кэш запросов (DataVersionWatcher).
+    """
+    table = DataVersion.__table__
+    stmt = sqlite_insert(table).values(name=DISCOUNTS_VERSION, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'version': table.c.version + 1}
+    )
+    await session.execute(stmt)
+
+
+# ===================== USER OPERATIONS =====================
+
+async def get_or_create_user(
+    telegram_id: int,
+    username: Optional[str] = None,
+    first_name: Optional[str] = None
+) -> User:
+    """Получить или создать пользователя"""
+    # Обычно пользователь уже есть и не менялся - обходимся читающим пулом
+    async with read_session() as session:
+        result = await session.execute(
+            select(User).where(User.telegram_id == telegram_id)
+        )
+        user = result.scalar_one_or_none()
+    
+    unchanged = (
+        (not username or user.username == username)
+        and (not first_name or user.first_name == first_name)
+    ) if user else False
+    if unchanged:
+        return user
+    
+    async with async_session() as session:
+        # Попытка найти пользователя
+        result = await session.execute(
+            select(User).where(User.telegram_id == telegram_id)
+        )
+        user = result.scalar_one_or_none()
+        
+        if user:
+            # Обновляем информацию, если изменилась
+            if username and user.username != username:
+                user.username = username
+            if first_name and user.first_name != first_name:
+                user.first_name = first_name
+            await session.commit()
+            return user
+        
+        # Создаем нового пользователя
+        user = User(
+            telegram_id=telegram_id,
+            username=username,
+            first_name=first_name
+        )
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return user
+
+
+async def update_user_city(telegram_id: int, city: str) -> Optional[User]:
+    """Обновить город пользователя"""
+    async with async_session() as session:
+        result = await session.execute(
+            select(User).where(User.telegram_id == telegram_id)
+        )
+        user = result.scalar_one_or_none()
+        
+        if user:
+            user.city = city
+            await session.commit()
+            await session.refresh(user)
+        
+        return user
+
+
+async def get_user_by_telegram_id(telegram_id: int) -> Optional[User]:
+    """Получить пользователя по Telegram ID"""
+    async with read_session() as session:
+        result = await session.execute(
+            select(User).where(User.telegram_id == telegram_id)
+        )
+        return result.scalar_one_or_none()
+
+
+# ===================== STORE OPERATIONS =====================
+
+async def get_store_by_name(name: str) -> Optional[Store]:
+    """Получить магазин по имени"""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Store).where(Store.name == name)
+        )
+        return result.scalar_one_or_none()
+
+
+async def create_store(
+    name: str,
+    category: str,
+    website: Optional[str] = None,
+    logo_url: Optional[str] = None,
+    description: Optional[str] = None
+) -> Store:
+    """Создать новый магазин"""
+    async with async_session() as session:
+        store = Store(
+            name=name,
+            category=category,
+            website=website,
+            logo_url=logo_url,
+            description=description
+        )
+        session.add(store)
+        await session.commit()
+        await session.refresh(store)
+        store_registry.remember(store.id, store.name)
+        return store
+
+
+async def resolve_store_id(
+    name: str,
+    category: str,
+    website: Optional[str] = None
+) -> int:
+    """Получить ID магазина через кэш, создав магазин при необходимости"""
+    store_id = store_registry.get_id(name)
+    if store_id is not None:
+        return store_id
+    
+    store = await get_store_by_name(name)
+    if not store:
+        store = await create_store(name=name, category=category, website=website)
+    store_registry.remember(store.id, store.name)
+    return store.id
+
+
+async def set_store_cities(store_id: int, cities: Union[List[str], str]):
+    """Задать города магазина (список городов или ALL_CITIES)"""
+    if isinstance(cities, str):
+        cities = [cities]
+    
+    async with async_session() as session:
+        await session.execute(
+            delete(StoreCity).where(StoreCity.store_id == store_id)
+        )
+        session.add_all(
+            StoreCity(store_id=store_id, city=city) for city in dict.fromkeys(cities)
+        )
+        await _bump_discounts_version(session)
+        await session.commit()
+    query_cache.bump_generation()
+
+
+def _stores_in_city(city: str):
+    """Подзапрос ID магазинов, доступных в городе"""
+    return select(StoreCity.store_id).where(
+        StoreCity.city.in_([city, ALL_CITIES])
+    )
+
+
+def _top_discounts_query(store_filters: list, limit: int, page: int):
+    """
+    Активные скидки с процентом по его убыванию, магазин - в каждом из
+    подзапросов store_filters
+    
+    Магазин проверяется через +store_id: без статистики ANALYZE SQLite
+    выбирает индекс по store_id и сортирует все найденные скидки во временном
+    B-дереве, а не читает ix_discounts_active_percent по убыванию процента.
+    """
+    store_id = UnaryExpression(Discount.store_id, operator=operators.custom_op('+'), type_=Discount.store_id.type)
+    return (
+        select(Discount)
+        .where(
+            *(store_id.in_(stores) for stores in store_filters),
+            Discount.is_active == True,
+            # Условие частичного индекса ix_discounts_active_percent
+            Discount.discount_percent.isnot(None)
+        )
+        .order_by(desc(Discount.discount_percent))
+        .offset(page * limit)
+        .limit(limit)
+    )
+
+
+def _best_discounts_query(city: str, limit: int, page: int):
+    """Запрос лучших скидок города"""
+    return _top_discounts_query([_stores_in_city(city)], limit, page)
+
+
+def _category_discounts_query(city: str, category: str, limit: int, page: int):
+    """Запрос лучших скидок категории в городе"""
+    category_stores = select(Store.id).where(Store.category == category)
+    return _top_discounts_query([_stores_in_city(city), category_stores], limit, page)
+
+
+async def get_stores_by_category(category: str) -> List[Store]:
+    """Получить магазины по категории"""
+    async with read_session() as session:
+        result = await session.execute(
+            select(Store).where(Store.category == category)
+        )
+        return result.scalars().all()
+
+
+# ===================== DISCOUNT OPERATIONS =====================
+
+async def save_discount(
+    store_id: int,
+    title: str,
+    new_price: float,
+    old_price: Optional[float] = None,
+    discount_percent: Optional[int] = None,
+    image_url: Optional[str] = None,
+    product_url: Optional[str] = None,
+    valid_until: Optional[datetime] = None
+) -> Discount:
+    """Сохранить скидку"""
+    async with async_session() as session:
+        # Проверяем, существует ли уже такая скидка (ключ store_id, title)
+        result = await session.execute(
+            select(Discount).where(
+                and_(
+                    Discount.store_id == store_id,
+                    Discount.title == title
+                )
+            )
+        )
+        existing = result.scalar_one_or_none()
+        
+        if existing:
+            # Обновляем существующую скидку
+            existing.old_price = old_price
+            existing.new_price = new_price
+            existing.discount_percent = discount_percent
+            existing.valid_until = valid_until
+            existing.is_active = True
+            existing.updated_at = datetime.utcnow()
+            await _bump_discounts_version(session)
+            await session.commit()
+            query_cache.bump_generation()
+            await session.refresh(existing)
+            return existing
+        
+        # Создаем новую скидку
+        discount = Discount(
+            store_id=store_id,
+            title=title,
+            old_price=old_price,
+            new_price=new_price,
+            discount_percent=discount_percent,
+            image_url=image_url,
+            product_url=product_url,
+            valid_until=valid_until
+        )
+        session.add(discount)
+        await _bump_discounts_version(session)
+        await session.commit()
+        query_cache.bump_generation()
+        await session.refresh(discount)
+        return discount
+
+
+async def save_discounts_bulk(store_id: int, discounts: Sequence[DiscountRecord]) -> Dict[str, int]:
+    """
+    Пакетное сохранение скидок магазина одной транзакцией
+    
+    Использует INSERT ... ON CONFLICT по ключу (store_id, title):
+    новые скидки добавляются, существующие обновляются и снова активируются.
+    
+    Returns:
+        Dict[str, int]: {'inserted': ..., 'updated': ...}
+    """
+    if not discounts:
+        return {'inserted': 0, 'updated': 0}
+    
+    now = datetime.utcnow()
+    # Повтор названия в пакете - та же строка по ключу (store_id, title):
+    # остается последняя запись, иначе вставка считалась бы дважды
+    rows = list({
+        discount.title: {
+            'store_id': store_id,
+            'title': discount.title,
+            'old_price': discount.old_price,
+            'new_price': discount.new_price,
+            'discount_percent': discount.discount_percent,
+            'image_url': discount.image_url,
+            'product_url': discount.product_url,
+            'valid_until': discount.valid_until,
+            'fingerprint': discount.fingerprint,
+            'valid_from': now,
+            'created_at': now,
+            'updated_at': now,
+            'is_active': True
+        }
+        for discount in discounts
+    }.values())
+    
+    stmt = sqlite_insert(Discount.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['store_id', 'title'],
+        set_={
+            'old_price': stmt.excluded.old_price,
+            'new_price': stmt.excluded.new_price,
+            'discount_percent': stmt.excluded.discount_percent,
+            'image_url': stmt.excluded.image_url,
+            'product_url': stmt.excluded.product_url,
+            'valid_until': stmt.excluded.valid_until,
+            'fingerprint': stmt.excluded.fingerprint,
+            'updated_at': stmt.excluded.updated_at,
+            'is_active': True
+        }
+    )
+    # Новая строка получает created_at = updated_at = now, обновленная
+    # сохраняет прежний created_at: признак вставки берется из RETURNING
+    stmt = stmt.returning(Discount.created_at == Discount.updated_at)
+    
+    async with async_session() as session:
+        result = await session.execute(stmt, rows)
+        inserted = sum(1 for is_new in result.scalars() if is_new)
+        await _bump_discounts_version(session)
+        await session.commit()
+    query_cache.bump_generation()
+    
+    return {'inserted': inserted, 'updated': len(rows) - inserted}
+
+
+async def get_discount_fingerprints(store_id: int) -> Set[str]:
+    """Отпечатки активных скидок магазина"""
+    async with read_session() as session:
+        result = await session.execute(
+            select(Discount.fingerprint)
+            .where(
+                and_(
+                    Discount.store_id == store_id,
+                    Discount.is_active == True,
+                    Discount.fingerprint.is_not(None)
+                )
+            )
+        )
+        return set(result.scalars())
+
+
+async def touch_discounts(store_id: int, fingerprints: Set[str], valid_until: datetime) -> int:
+    """
+    Продление неизменившихся скидок магазина по отпечаткам
+    
+    Вместо повторного upsert каждой карточки обновляются только
+    valid_until и updated_at пакетными UPDATE.
+    
+    Returns:
+        int: Количество продленных скидок
+    """
+    if not fingerprints:
+        return 0
+    
+    now = datetime.utcnow()
+    fingerprints = list(fingerprints)
+    touched = 0
+    
+    async with async_session() as session:
+        for start in range(0, len(fingerprints), FINGERPRINT_CHUNK):
+            result = await session.execute(
+                update(Discount)
+                .where(
+                    and_(
+                        Discount.store_id == store_id,
+                        Discount.fingerprint.in_(fingerprints[start:start + FINGERPRINT_CHUNK])
+                    )
+                )
+                .values(valid_until=valid_until, updated_at=now, is_active=True)
+            )
+            touched += result.rowcount
+        await _bump_discounts_version(session)
+        await session.commit()
+    query_cache.bump_generation()
+    
+    return touched
+
+
+async def get_page_fingerprints(store_id: int) -> Dict[str, Dict[str, Any]]:
+    """Отпечатки страниц магазина с прошлого разбора: URL -> запись"""
+    async with read_session() as session:
+        result = await session.execute(
+            select(PageFingerprint.__table__).where(PageFingerprint.store_id == store_id)
+        )
+        return {row['url']: dict(row) for row in result.mappings()}
+
+
+async def save_page_fingerprints(store_id: int, pages: Dict[str, Dict[str, Any]]):
+    """Сохранение отпечатков разобранных страниц магазина"""
+    if not pages:
+        return
+    
+    now = datetime.utcnow()
+    rows = [
+        {
+            'store_id': store_id,
+            'url': url,
+            'content_hash': page['content_hash'],
+            'next_href': page.get('next_href'),
+            'card_count': page.get('card_count', 0),
+            'card_fingerprints': page.get('card_fingerprints', ''),
+            'updated_at': now
+        }
+        for url, page in pages.items()
+    ]
+    
+    stmt = sqlite_insert(PageFingerprint.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['store_id', 'url'],
+        set_={
+            'content_hash': stmt.excluded.content_hash,
+            'next_href': stmt.excluded.next_href,
+            'card_count': stmt.excluded.card_count,
+            'card_fingerprints': stmt.excluded.card_fingerprints,
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+    
+    async with async_session() as session:
+        await session.execute(stmt, rows)
+        await session.commit()
+
+
+async def get_discounts_by_category(
+    city: str,
+    category: str,
+    limit: int = 20,
+    page: int = 0
+) -> List[Discount]:
+    """Получить скидки по категории и городу (имя магазина - через store_registry)"""
+    key = ('category', city, category, limit, page)
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = query_cache.generation
+    
+    discounts = await _get_leaderboard_slice('city_category', f"{city}|{category}", limit, page)
+    if not discounts:
+        # Топ еще не построен или страница за его пределами
+        async with read_session() as session:
+            result = await session.execute(_category_discounts_query(city, category, limit, page))
+            discounts = result.scalars().all()
+    
+    query_cache.set(key, discounts, generation)
+    return discounts
+
+
+async def get_best_discounts(city: str, limit: int = 10, page: int = 0) -> List[Discount]:
+    """
+    Получить лучшие скидки по городу (сортировка по проценту скидки).
+    Имя магазина - через store_registry.
+    """
+    key = ('best', city, None, limit, page)
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached
+    generation = query_cache.generation
+    
+    discounts = await _get_leaderboard_slice('city', city, limit, page)
+    if not discounts:
+        # Топ еще не построен или страница за его пределами
+        async with read_session() as session:
+            result = await session.execute(_best_discounts_query(city, limit, page))
+            discounts = result.scalars().all()
+    
+    query_cache.set(key, discounts, generation)
+    return discounts
+
+
+async def _get_leaderboard_slice(scope: str, key: str, limit: int, page: int) -> List[Discount]:
+    """Срез предрасчитанного топа по позициям (без сортировки таблицы скидок)"""
+    first_rank = page * limit + 1
+    last_rank = first_rank + limit - 1
+    if last_rank > settings.LEADERBOARD_SIZE:
+        return []
+    
+    async with read_session() as session:
+        result = await session.execute(
+            select(Discount)
+            .join(LeaderboardEntry, LeaderboardEntry.discount_id == Discount.id)
+            .where(
+                and_(
+                    LeaderboardEntry.scope == scope,
+                    LeaderboardEntry.key == key,
+                    LeaderboardEntry.rank.between(first_rank, last_rank),
+                    Discount.is_active == True
+                )
+            )
+            .order_by(LeaderboardEntry.rank)
+        )
+        return result.scalars().all()
+
+
+async def rebuild_leaderboard(top_n: Optional[int] = None) -> int:
+    """
+    Перестроить предрасчитанный топ скидок
+    
+    Топ города собирается из топов доступных в нем магазинов, поэтому
+    сортировать всю таблицу скидок для каждого города не нужно. Старый топ
+    заменяется новым в одной транзакции.
+    
+    Returns:
+        int: Количество записей в топе
+    """
+    top_n = top_n or settings.LEADERBOARD_SIZE
+    
+    async with read_session() as session:
+        discounts_result = await session.execute(
+            select(Discount.id, Discount.store_id, Discount.discount_percent)
+            .where(
+                and_(
+                    Discount.is_active == True,
+                    Discount.discount_percent.isnot(None)
+                )
+            )
+        )
+        stores_result = await session.execute(select(Store.id, Store.category))
+        cities_result = await session.execute(select(StoreCity.store_id, StoreCity.city))
+        
+        by_store: Dict[int, List[Tuple[int, int]]] = {}
+        for discount_id, store_id, percent in discounts_result.all():
+            by_store.setdefault(store_id, []).append((percent, discount_id))
+        store_categories = dict(stores_result.all())
+        store_cities: Dict[int, List[str]] = {}
+        for store_id, city in cities_result.all():
+            store_cities.setdefault(store_id, []).append(city)
+    
+    # Топ каждого магазина: лучшие скидки города могут быть только среди них
+    store_top = {
+        store_id: heapq.nlargest(top_n, items)
+        for store_id, items in by_store.items()
+    }
+    
+    all_cities = set(settings.SUPPORTED_CITIES)
+    for cities in store_cities.values():
+        all_cities.update(city for city in cities if city != ALL_CITIES)
+    
+    city_candidates: Dict[str, List[Tuple[int, int]]] = {}
+    category_candidates: Dict[str, List[Tuple[int, int]]] = {}
+    for store_id, top in store_top.items():
+        cities = store_cities.get(store_id, [])
+        if ALL_CITIES in cities:
+            cities = all_cities
+        category = store_categories.get(store_id)
+        for city in cities:
+            city_candidates.setdefault(city, []).extend(top)
+            category_candidates.setdefault(f"{city}|{category}", []).extend(top)
+    
+    rows = []
+    for scope, candidates in (
+        ('store', {str(store_id): top for store_id, top in store_top.items()}),
+        ('city', city_candidates),
+        ('city_category', category_candidates)
+    ):
+        for key, items in candidates.items():
+            for rank, (_, discount_id) in enumerate(heapq.nlargest(top_n, items), 1):
+                rows.append({
+                    'scope': scope,
+                    'key': key,
+                    'rank': rank,
+                    'discount_id': discount_id
+                })
+    
+    async with async_session() as session:
+        await session.execute(delete(LeaderboardEntry))
+        if rows:
+            await session.execute(LeaderboardEntry.__table__.insert(), rows)
+        await _bump_discounts_version(session)
+        await session.commit()
+    query_cache.bump_generation()
+    
+    return len(rows)
+
+
+async def deactivate_old_discounts():
+    """Деактивировать устаревшие скидки"""
+    async with async_session() as session:
+        await session.execute(
+            update(Discount)
+            .where(
+                and_(
+                    Discount.valid_until < datetime.utcnow(),
+                    Discount.is_active == True
+                )
+            )
+            .values(is_active=False)
+        )
+        await _bump_discounts_version(session)
+        await session.commit()
+    query_cache.bump_generation()
+
+
+# ===================== SUBSCRIPTION OPERATIONS =====================
+
+async def toggle_subscription(telegram_id: int, category: str) -> bool:
+    """Переключить подписку на категорию. Возвращает True если подписка активирована."""
+    async with async_session() as session:
+        # Получаем пользователя
+        user_result = await session.execute(
+            select(User).where(User.telegram_id == telegram_id)
+        )
+        user = user_result.scalar_one_or_none()
+        
+        if not user:
+            return False
+        
+        # Проверяем существующую подписку
+        sub_result = await session.execute(
+            select(Subscription).where(
+                and_(
+                    Subscription.user_id == user.id,
+                    Subscription.category == category
+                )
+            )
+        )
+        subscription = sub_result.scalar_one_or_none()
+        
+        if subscription:
+            # Переключаем статус
+            subscription.is_active = not subscription.is_active
+            await session.commit()
+            return subscription.is_active
+        else:
+            # Создаем новую подписку
+            subscription = Subscription(
+                user_id=user.id,
+                category=category,
+                is_active=True
+            )
+            session.add(subscription)
+            await session.commit()
+            return True
+
+
+async def get_user_subscriptions(telegram_id: int) -> List[Subscription]:
+    """Получить активные подписки пользователя"""
+    async with read_session() as session:
+        result = await session.execute(
+            select(Subscription)
+            .join(User)
+            .where(
+                and_(
+                    User.telegram_id == telegram_id,
+                    Subscription.is_active == True
+                )
+            )
+        )
+        return result.scalars().all()
+
+
+async def get_subscribers_by_category(category: str) -> List[User]:
+    """Получить всех подписчиков категории для рассылки"""
+    async with read_session() as session:
+        result = await session.execute(
+            select(User)
+            .join(Subscription)
+            .where(
+                and_(
+                    Subscription.category == category,
+                    Subscription.is_active == True,
+                    User.is_active == True
+                )
+            )
+        )
+        return result.scalars().all()
@@ -0,0 +1,229 @@
+"""
+Очередь заданий скрапинга в SQLite
+
+Бот ставит задания (по одному на магазин), процессы-обработчики
+(python -m src.worker) забирают их. Задание берется одной командой
+UPDATE ... RETURNING, поэтому два процесса не получат одно задание.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, update, delete, and_, or_, case, func
+
+from config.settings import settings
+from src.database.models import async_session, read_session, ScrapeJob
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+async def enqueue_scrape_jobs(store_names: Iterable[str]) -> int:
+    """
+    Поставить задания скрапинга магазинов
+    
+    Магазин, для которого уже есть ожидающее задание, пропускается:
+    повторные запуски расписания не копят очередь.
+    
+    Returns:
+        int: Количество новых заданий
+    """
+    names = list(dict.fromkeys(store_names))
+    if not names:
+        return 0
+    
+    async with async_session() as session:
+        result = await session.execute(
+            select(ScrapeJob.store_name).where(
+                ScrapeJob.status == JOB_PENDING,
+                ScrapeJob.store_name.in_(names)
+            )
+        )
+        queued = set(result.scalars())
+        new_names = [name for name in names if name not in queued]
+        session.add_all([ScrapeJob(store_name=name, status=JOB_PENDING) for name in new_names])
+        await session.commit()
+    return len(new_names)
+
+
+async def claim_scrape_job(worker: str, lease: Optional[int] = None) -> Optional[ScrapeJob]:
+    """
+    Взять самое старое доступное задание
+    
+    Доступно ожидающее задание или взятое, срок которого истек (обработчик
+    завершился аварийно). Магазин, задание которого сейчас выполняется,
+    пропускается: один магазин не обходится двумя процессами сразу.
+    
+    Returns:
+        ScrapeJob или None, если очередь пуста
+    """
+    now = datetime.utcnow()
+    locked_until = now + timedelta(seconds=lease or settings.SCRAPE_JOB_LEASE)
+    available = or_(
+        ScrapeJob.status == JOB_PENDING,
+        and_(ScrapeJob.status == JOB_RUNNING, ScrapeJob.locked_until < now)
+    )
+    busy_stores = select(ScrapeJob.store_name).where(
+        ScrapeJob.status == JOB_RUNNING,
+        ScrapeJob.locked_until >= now
+    )
+    next_job = (
+        select(ScrapeJob.id)
+        .where(available, ScrapeJob.store_name.not_in(busy_stores))
+        .order_by(ScrapeJob.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(ScrapeJob)
+        .where(ScrapeJob.id == next_job)
+        .values(
+            status=JOB_RUNNING,
+            worker=worker,
+            locked_until=locked_until,
+            started_at=now,
+            attempts=ScrapeJob.attempts + 1
+        )
+        .returning(ScrapeJob)
+        .execution_options(synchronize_session=False)
+    )
+    
+    async with async_session() as session:
+        job = (await session.execute(stmt)).scalar_one_or_none()
+        await session.commit()
+    return job
+
+
+def _owned_by(job_id: int, worker: str):
+    """
+    Задание взято этим обработчиком и еще выполняется: после истечения срока
+    его мог забрать другой обработчик, и результат прежнего уже не записывается
+    """
+    return and_(ScrapeJob.id == job_id, ScrapeJob.worker == worker, ScrapeJob.status == JOB_RUNNING)
+
+
+async def extend_scrape_job(job_id: int, worker: str, lease: Optional[int] = None):
+    """Продлить срок взятого задания (обработчик жив)"""
+    locked_until = datetime.utcnow() + timedelta(seconds=lease or settings.SCRAPE_JOB_LEASE)
+    async with async_session() as session:
+        await session.execute(
+            update(ScrapeJob)
+            .where(_owned_by(job_id, worker))
+            .values(locked_until=locked_until)
+        )
+        await session.commit()
+
+
+async def finish_scrape_job(job_id: int, worker: str, saved: int) -> bool:
+    """
+    Задание выполнено
+    
+    Returns:
+        bool: False, если задание уже забрал другой обработчик
+    """
+    async with async_session() as session:
+        result = await session.execute(
+            update(ScrapeJob)
+            .where(_owned_by(job_id, worker))
+            .values(status=JOB_DONE, saved=saved, locked_until=None, finished_at=datetime.utcnow())
+        )
+        await session.commit()
+    return bool(result.rowcount)
+
+
+async def fail_scrape_job(job_id: int, worker: str, error: str, saved: Optional[int] = None) -> bool:
+    """
+    Ошибка выполнения задания (в том числе частичная запись: saved скидок
+    записано, часть потеряна)
+    
+    Пока не исчерпаны попытки (SCRAPE_JOB_MAX_ATTEMPTS), задание
+    возвращается в очередь.
+    
+    Returns:
+        bool: False, если задание уже забрал другой обработчик
+    """
+    retry = ScrapeJob.attempts < settings.SCRAPE_JOB_MAX_ATTEMPTS
+    async with async_session() as session:
+        result = await session.execute(
+            update(ScrapeJob)
+            .where(_owned_by(job_id, worker))
+            .values(
+                error=error[:1000],
+                saved=saved,
+                locked_until=None,
+                status=case((retry, JOB_PENDING), else_=JOB_FAILED),
+                finished_at=case((retry, None), else_=datetime.utcnow())
+            )
+        )
+        await session.commit()
+    return bool(result.rowcount)
+
+
+async def has_active_scrape_jobs() -> bool:
+    """Есть ли ожидающие или выполняющиеся задания"""
+    async with read_session() as session:
+        count = await session.scalar(
+            select(func.count()).select_from(ScrapeJob)
+            .where(ScrapeJob.status.in_((JOB_PENDING, JOB_RUNNING)))
+        )
+    return bool(count)
+
+
+async def get_scrape_history(
+    store_names: Iterable[str],
+    limit: Optional[int] = None
+) -> Dict[str, List[Tuple[datetime, int]]]:
+    """
+    История выполненных заданий магазинов: [(завершено, сохранено скидок)],
+    последние limit (SCRAPE_HISTORY_SIZE) заданий, новые первыми
+    
+    Сохраненные скидки - это новые и изменившиеся карточки (неизменившиеся
+    только продлеваются), поэтому saved > 0 означает, что магазин изменился.
+    Неудачные попытки (магазин недоступен, скидки не записаны) в историю не
+    входят: saved = 0 у них не значит, что магазин не менялся.
+    """
+    limit = limit or settings.SCRAPE_HISTORY_SIZE
+    history: Dict[str, List[Tuple[datetime, int]]] = {name: [] for name in store_names}
+    if not history:
+        return history
+    
+    # Запрос на магазин: последние limit заданий читаются по индексу
+    # ix_scrape_jobs_store_status, без выборки всей истории
+    async with read_session() as session:
+        for store_name in history:
+            result = await session.execute(
+                select(ScrapeJob.finished_at, ScrapeJob.saved)
+                .where(ScrapeJob.store_name == store_name, ScrapeJob.status == JOB_DONE)
+                .order_by(ScrapeJob.finished_at.desc())
+                .limit(limit)
+            )
+            history[store_name] = [(finished_at, saved or 0) for finished_at, saved in result.all()]
+    return history
+
+
+async def get_finished_store_names(since: datetime) -> List[str]:
+    """Магазины, задания которых выполнены после since"""
+    async with read_session() as session:
+        result = await session.execute(
+            select(ScrapeJob.store_name).distinct()
+            .where(ScrapeJob.status == JOB_DONE, ScrapeJob.finished_at >= since)
+        )
+        return list(result.scalars())
+
+
+async def prune_scrape_jobs(days: Optional[int] = None) -> int:
+    """Удалить завершенные задания старше days дней (SCRAPE_JOB_KEEP_DAYS)"""
+    cutoff = datetime.utcnow() - timedelta(days=days or settings.SCRAPE_JOB_KEEP_DAYS)
+    async with async_session() as session:
+        result = await session.execute(
+            delete(ScrapeJob).where(
+                ScrapeJob.status.in_((JOB_DONE, JOB_FAILED)),
+                ScrapeJob.finished_at < cutoff
+            )
+        )
+        await session.commit()
+    return result.rowcount or 0
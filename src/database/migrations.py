@@ -0,0 +1,106 @@
+"""
+Версионные миграции схемы SQLite
+"""
+
+import logging
+from typing import Awaitable, Callable, List, Tuple, Union
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Шаг миграции: SQL-команда или функция, получающая соединение
+MigrationStep = Union[str, Callable[..., Awaitable[None]]]
+
+
+def add_column(table: str, column: str, ddl: str) -> Callable[..., Awaitable[None]]:
+    """
+    Шаг миграции: добавить столбец, если его еще нет
+    
+    В SQLite нет ADD COLUMN IF NOT EXISTS, а на новой базе столбец
+    уже создан create_all.
+    """
+    async def step(conn):
+        result = await conn.execute(text(f"PRAGMA table_info({table})"))
+        if column not in {row[1] for row in result}:
+            await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return step
+
+
+# Миграции: (версия, описание, шаги).
+# Текущая версия схемы хранится в PRAGMA user_version. Шаги должны быть
+# идемпотентными: на новой базе create_all уже создал таблицы и индексы модели.
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (
+        1,
+        "Ключ (store_id, title) и города магазинов в store_cities",
+        [
+            # Города старых построчных записей переносим на уровень магазина
+            "INSERT OR IGNORE INTO store_cities (store_id, city) "
+            "SELECT DISTINCT store_id, city FROM discounts WHERE city IS NOT NULL",
+            # Дубликаты товара по городам: остается самая свежая запись
+            "DELETE FROM discounts WHERE id NOT IN ("
+            "SELECT MAX(id) FROM discounts GROUP BY store_id, title)",
+            "DROP INDEX IF EXISTS uq_discounts_store_title_city",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_discounts_store_title "
+            "ON discounts (store_id, title)",
+        ],
+    ),
+    (
+        2,
+        "Составные и частичные индексы для запросов чтения",
+        [
+            # Лучшие скидки и скидки по категории: активные по убыванию процента
+            "CREATE INDEX IF NOT EXISTS ix_discounts_active_percent "
+            "ON discounts (discount_percent, store_id) "
+            "WHERE is_active = 1 AND discount_percent IS NOT NULL",
+            # Деактивация устаревших скидок
+            "CREATE INDEX IF NOT EXISTS ix_discounts_active_valid_until "
+            "ON discounts (valid_until) WHERE is_active = 1",
+            # Индекс по городу больше не используется (города - в store_cities)
+            "DROP INDEX IF EXISTS ix_discounts_city",
+        ],
+    ),
+    (
+        3,
+        "Отпечатки карточек для пропуска неизменившихся скидок",
+        [
+            add_column("discounts", "fingerprint", "VARCHAR(32)"),
+            "CREATE INDEX IF NOT EXISTS ix_discounts_store_fingerprint "
+            "ON discounts (store_id, fingerprint)",
+        ],
+    ),
+    (
+        4,
+        "История заданий магазина по времени завершения",
+        [
+            "DROP INDEX IF EXISTS ix_scrape_jobs_store_status",
+            "CREATE INDEX IF NOT EXISTS ix_scrape_jobs_store_status "
+            "ON scrape_jobs (store_name, status, finished_at)",
+        ],
+    ),
+]
+
+
+async def get_schema_version(conn) -> int:
+    """Текущая версия схемы"""
+    result = await conn.execute(text("PRAGMA user_version"))
+    return result.scalar() or 0
+
+
+async def run_migrations(conn):
+    """Применить все миграции новее текущей версии схемы"""
+    version = await get_schema_version(conn)
+    
+    for target, description, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        
+        logger.info(f"Миграция схемы {target}: {description}")
+        for statement in statements:
+            if callable(statement):
+                await statement(conn)
+            else:
+                await conn.execute(text(statement))
+        # PRAGMA не поддерживает параметры, версия - число из списка выше
+        await conn.execute(text(f"PRAGMA user_version = {int(target)}"))
+        version = target
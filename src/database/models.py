@@ -1,113 +1,275 @@
-"""
-Модели базы данных SQLite
-"""
-
-from datetime import datetime
-from typing import Optional
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase, relationship
-from config.settings import settings
-
-
-class Base(DeclarativeBase):
-    """Базовый класс для всех моделей"""
-    pass
-
-
-class User(Base):
-    """Модель пользователя"""
-    __tablename__ = "users"
-    
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(Integer, unique=True, nullable=False, index=True)
-    username = Column(String(100), nullable=True)
-    first_name = Column(String(100), nullable=True)
-    city = Column(String(50), nullable=True, default="Минск")
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    is_active = Column(Boolean, default=True)
-    
-    # Отношения
-    subscriptions = relationship("Subscription", back_populates="user", cascade="all, delete-orphan")
-
-
-class Store(Base):
-    """Модель магазина"""
-    __tablename__ = "stores"
-    
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    name = Column(String(200), nullable=False, unique=True)
-    category = Column(String(50), nullable=False, index=True)  # grocery, clothing, electronics, home
-    website = Column(String(500), nullable=True)
-    logo_url = Column(String(500), nullable=True)
-    description = Column(Text, nullable=True)
-    cities = Column(String(500), default="Минск,Борисов,Жодино")  # Города где работает магазин
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
-    # Отношения
-    discounts = relationship("Discount", back_populates="store", cascade="all, delete-orphan")
-
-
-class Discount(Base):
-    """Модель скидки/акции"""
-    __tablename__ = "discounts"
-    
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
-    title = Column(String(500), nullable=False)
-    description = Column(Text, nullable=True)
-    old_price = Column(Float, nullable=True)
-    new_price = Column(Float, nullable=False)
-    discount_percent = Column(Integer, nullable=True)
-    image_url = Column(String(1000), nullable=True)
-    product_url = Column(String(1000), nullable=True)
-    city = Column(String(50), default="Минск", index=True)
-    valid_from = Column(DateTime, default=datetime.utcnow)
-    valid_until = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    is_active = Column(Boolean, default=True)
-    
-    # Отношения
-    store = relationship("Store", back_populates="discounts")
-
-
-class Subscription(Base):
-    """Модель подписки пользователя на категорию"""
-    __tablename__ = "subscriptions"
-    
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    category = Column(String(50), nullable=False)  # grocery, clothing, electronics, home
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
-    # Отношения
-    user = relationship("User", back_populates="subscriptions")
-
-
-# Создание асинхронного движка
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG
-)
-
-# Создание фабрики сессий
-async_session = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
-
-
-async def init_db():
-    """Инициализация базы данных"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-
-async def get_session() -> AsyncSession:
-    """Получение сессии базы данных"""
-    async with async_session() as session:
-        yield session
+"""
+Модели базы данных SQLite
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, Index, text, event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, relationship
+from config.settings import settings
+from src.database.migrations import run_migrations
+
+# Значение города для магазинов, работающих по всей Беларуси
+ALL_CITIES = "all"
+
+# Счетчик изменений данных скидок в таблице data_versions
+DISCOUNTS_VERSION = "discounts"
+
+
+class Base(DeclarativeBase):
+    """Базовый класс для всех моделей"""
+    pass
+
+
+class User(Base):
+    """Модель пользователя"""
+    __tablename__ = "users"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    telegram_id = Column(Integer, unique=True, nullable=False, index=True)
+    username = Column(String(100), nullable=True)
+    first_name = Column(String(100), nullable=True)
+    city = Column(String(50), nullable=True, default="Минск")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    is_active = Column(Boolean, default=True)
+    
+    # Отношения
+    subscriptions = relationship("Subscription", back_populates="user", cascade="all, delete-orphan")
+
+
+class Store(Base):
+    """Модель магазина"""
+    __tablename__ = "stores"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(200), nullable=False, unique=True)
+    category = Column(String(50), nullable=False, index=True)  # grocery, clothing, electronics, home
+    website = Column(String(500), nullable=True)
+    logo_url = Column(String(500), nullable=True)
+    description = Column(Text, nullable=True)
+    cities = Column(String(500), default="Минск,Борисов,Жодино")  # Города где работает магазин
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Отношения
+    discounts = relationship("Discount", back_populates="store", cascade="all, delete-orphan")
+    available_cities = relationship("StoreCity", back_populates="store", cascade="all, delete-orphan")
+
+
+class StoreCity(Base):
+    """Доступность магазина в городе (city = ALL_CITIES - вся Беларусь)"""
+    __tablename__ = "store_cities"
+    
+    store_id = Column(Integer, ForeignKey("stores.id"), primary_key=True)
+    city = Column(String(50), primary_key=True)
+    
+    # Отношения
+    store = relationship("Store", back_populates="available_cities")
+    
+    __table_args__ = (
+        Index("ix_store_cities_city", "city", "store_id"),
+    )
+
+
+class Discount(Base):
+    """Модель скидки/акции"""
+    __tablename__ = "discounts"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    title = Column(String(500), nullable=False)
+    description = Column(Text, nullable=True)
+    old_price = Column(Float, nullable=True)
+    new_price = Column(Float, nullable=False)
+    discount_percent = Column(Integer, nullable=True)
+    image_url = Column(String(1000), nullable=True)
+    product_url = Column(String(1000), nullable=True)
+    # Устарело: города задаются на уровне магазина через store_cities
+    city = Column(String(50), nullable=True)
+    valid_from = Column(DateTime, default=datetime.utcnow)
+    valid_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    is_active = Column(Boolean, default=True)
+    # Хэш полей карточки: совпадение - скидка не изменилась с прошлого запуска
+    fingerprint = Column(String(32), nullable=True)
+    
+    # Отношения
+    store = relationship("Store", back_populates="discounts")
+    
+    __table_args__ = (
+        # Ключ для пакетного upsert (INSERT ... ON CONFLICT)
+        Index("uq_discounts_store_title", "store_id", "title", unique=True),
+        # Индексы ниже дублируются миграцией 2 в src/database/migrations.py
+        Index(
+            "ix_discounts_active_percent", "discount_percent", "store_id",
+            sqlite_where=text("is_active = 1 AND discount_percent IS NOT NULL")
+        ),
+        Index(
+            "ix_discounts_active_valid_until", "valid_until",
+            sqlite_where=text("is_active = 1")
+        ),
+        # Продление неизменившихся скидок по отпечатку (миграция 3)
+        Index("ix_discounts_store_fingerprint", "store_id", "fingerprint"),
+    )
+
+
+class PageFingerprint(Base):
+    """
+    Отпечаток страницы акций магазина с прошлого разбора.
+    
+    card_fingerprints - отпечатки карточек страницы через пробел: если хэш
+    страницы не изменился, ее скидки продлеваются без разбора.
+    """
+    __tablename__ = "page_fingerprints"
+    
+    store_id = Column(Integer, ForeignKey("stores.id"), primary_key=True)
+    url = Column(String(1000), primary_key=True)
+    content_hash = Column(String(32), nullable=False)
+    next_href = Column(String(1000), nullable=True)
+    card_count = Column(Integer, nullable=False, default=0)
+    card_fingerprints = Column(Text, nullable=False, default="")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ScrapeJob(Base):
+    """
+    Задание скрапинга в очереди для процессов-обработчиков (python -m src.worker).
+    
+    status: 'pending' -> 'running' -> 'done' / 'failed'. Взятое задание
+    держится до locked_until и продлевается обработчиком; задание упавшего
+    процесса по истечении срока снова доступно другим обработчикам.
+    """
+    __tablename__ = "scrape_jobs"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    store_name = Column(String(200), nullable=False)
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    worker = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    saved = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_scrape_jobs_status", "status", "id"),
+        # Ожидающие задания магазина и его история по времени завершения
+        Index("ix_scrape_jobs_store_status", "store_name", "status", "finished_at"),
+    )
+
+
+class LeaderboardEntry(Base):
+    """
+    Предрасчитанный топ скидок.
+    
+    Перестраивается целиком после каждого скрапинга.
+    scope: 'city' (key - город), 'city_category' (key - 'город|категория'),
+    'store' (key - id магазина)
+    """
+    __tablename__ = "leaderboard"
+    
+    scope = Column(String(20), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    discount_id = Column(Integer, ForeignKey("discounts.id"), nullable=False)
+
+
+class DataVersion(Base):
+    """
+    Счетчики изменений данных.
+    
+    Счетчик DISCOUNTS_VERSION увеличивается в транзакции записи скидок,
+    топа и городов магазинов: по нему процесс бота сбрасывает кэш запросов.
+    Записи пользователей и очереди заданий его не меняют.
+    """
+    __tablename__ = "data_versions"
+    
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class Subscription(Base):
+    """Модель подписки пользователя на категорию"""
+    __tablename__ = "subscriptions"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    category = Column(String(50), nullable=False)  # grocery, clothing, electronics, home
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Отношения
+    user = relationship("User", back_populates="subscriptions")
+
+
+def _apply_sqlite_pragmas(engine, read_only: bool = False):
+    """Настройки SQLite для каждого нового соединения движка"""
+    if not settings.DATABASE_URL.startswith("sqlite"):
+        return
+    
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if settings.SQLITE_WAL:
+            # WAL: читатели не блокируются писателем и наоборот
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+# Движок для записи (скрапинг, изменения пользователей и подписок).
+# В SQLite пишет одно соединение за раз, поэтому у процесса один писатель:
+# записи ждут соединение в пуле, а не блокировку БД до busy_timeout
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_size=1,
+    max_overflow=0
+)
+_apply_sqlite_pragmas(engine)
+
+# Пул только для чтения: запросы из обработчиков Telegram
+read_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=0
+)
+_apply_sqlite_pragmas(read_engine, read_only=True)
+
+# Создание фабрик сессий
+async_session = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+read_session = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
+async def init_db():
+    """Инициализация базы данных"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Индексы и изменения схемы для уже существующих баз
+        await run_migrations(conn)
+
+
+async def get_session() -> AsyncSession:
+    """Получение сессии базы данных"""
+    async with async_session() as session:
+        yield session
@@ -0,0 +1,115 @@
+"""
+Кэш результатов запросов скидок
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import select
+
+from config.settings import settings
+from src.database.models import DataVersion, DISCOUNTS_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCache:
+    """
+    LRU-кэш результатов запросов с поколениями.
+    
+    Данные о скидках меняются только при записи результатов скрапинга,
+    поэтому каждая такая запись увеличивает поколение и сбрасывает кэш.
+    Результат запроса, начатого в старом поколении, в кэш не попадает.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or settings.QUERY_CACHE_SIZE
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Результат из кэша или None"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+    
+    def set(self, key: Hashable, value: Any, generation: int):
+        """
+        Сохранить результат запроса
+        
+        Args:
+            generation: Поколение на момент начала запроса
+        """
+        if generation != self.generation:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def bump_generation(self):
+        """Новое поколение данных: все сохраненные результаты устарели"""
+        self.generation += 1
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий и промахов"""
+        return {
+            'generation': self.generation,
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class DataVersionWatcher:
+    """
+    Сброс кэша при записи скидок другими процессами (обработчиками очереди).
+    
+    Сравнивается счетчик DISCOUNTS_VERSION из data_versions: его увеличивают
+    только записи скидок, топа и городов магазинов. PRAGMA data_version не
+    подходит - его меняют и записи самого бота (пользователи, очередь заданий),
+    и каждая такая запись сбрасывала бы кэш. Соединение держится открытым,
+    а проверка - один запрос по первичному ключу.
+    """
+    
+    def __init__(self, engine, cache: QueryCache):
+        self.engine = engine
+        self.cache = cache
+        self._conn = None
+        self._version: Optional[int] = None
+        
+    async def check(self) -> bool:
+        """Сбросить кэш, если данные скидок изменились; True - кэш сброшен"""
+        if self._conn is None:
+            self._conn = await self.engine.connect()
+        try:
+            version = (await self._conn.execute(
+                select(DataVersion.version).where(DataVersion.name == DISCOUNTS_VERSION)
+            )).scalar() or 0
+        finally:
+            # Не держать открытую транзакцию чтения
+            await self._conn.rollback()
+        
+        changed = self._version is not None and version != self._version
+        self._version = version
+        if changed:
+            self.cache.bump_generation()
+            logger.debug("Кэш запросов сброшен: скидки изменены другим процессом")
+        return changed
+    
+    async def close(self):
+        """Закрыть соединение"""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+# Общий кэш запросов процесса
+query_cache = QueryCache()
@@ -0,0 +1,43 @@
+"""
+Запись скидки, передаваемая от скраперов в пакетную запись БД
+"""
+
+import sys
+from datetime import datetime
+from typing import Any, Mapping, NamedTuple, Optional
+
+
+class DiscountRecord(NamedTuple):
+    """
+    Скидка, полученная скрапером
+    
+    Кортеж без __dict__ занимает в несколько раз меньше памяти, чем словарь
+    с теми же полями; строки магазина и категории интернируются, поэтому
+    все записи магазина ссылаются на один объект строки.
+    """
+    title: str
+    old_price: Optional[float]
+    new_price: float
+    discount_percent: Optional[int]
+    image_url: Optional[str]
+    product_url: Optional[str]
+    valid_until: Optional[datetime]
+    store_name: str
+    category: str
+    fingerprint: Optional[str] = None
+    
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> "DiscountRecord":
+        """Запись из словаря скидки (формат scrape_discounts прежних скраперов)"""
+        return cls(
+            title=data['title'],
+            old_price=data.get('old_price'),
+            new_price=data['new_price'],
+            discount_percent=data.get('discount_percent'),
+            image_url=data.get('image_url'),
+            product_url=data.get('product_url'),
+            valid_until=data.get('valid_until'),
+            store_name=sys.intern(data['store_name']),
+            category=sys.intern(data['category']),
+            fingerprint=data.get('fingerprint')
+        )
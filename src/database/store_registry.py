@@ -0,0 +1,52 @@
+"""
+Кэш магазинов в памяти (имя <-> id)
+"""
+
+import logging
+from typing import Dict, Optional
+from sqlalchemy import select
+
+from src.database.models import read_session, Store
+
+logger = logging.getLogger(__name__)
+
+
+class StoreRegistry:
+    """
+    Реестр магазинов в памяти.
+    
+    Магазинов единицы, а обращений к ним - тысячи за один запуск скрапинга,
+    поэтому таблица stores читается один раз при старте, а дальше разрешение
+    магазина по имени - это поиск в словаре.
+    """
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        
+    async def warm(self):
+        """Загрузить все магазины из БД"""
+        async with read_session() as session:
+            result = await session.execute(select(Store.id, Store.name))
+            for store_id, name in result.all():
+                self.remember(store_id, name)
+        logger.info(f"Загружено магазинов в кэш: {len(self._ids)}")
+        
+    def get_id(self, name: str) -> Optional[int]:
+        """ID магазина по имени (только из кэша)"""
+        return self._ids.get(name)
+    
+    async def get_name(self, store_id: int) -> Optional[str]:
+        """Имя магазина по ID; при промахе кэш перечитывается из БД"""
+        if store_id not in self._names:
+            await self.warm()
+        return self._names.get(store_id)
+    
+    def remember(self, store_id: int, name: str):
+        """Добавить магазин в кэш"""
+        self._ids[name] = store_id
+        self._names[store_id] = name
+
+
+# Общий реестр магазинов процесса
+store_registry = StoreRegistry()
@@ -1,5 +1,5 @@
-"""Handlers Package"""
-from src.handlers.commands import router as commands_router
-from src.handlers.callbacks import router as callbacks_router
-
-__all__ = ['commands_router', 'callbacks_router']
+"""Handlers Package"""
+from src.handlers.commands import router as commands_router
+from src.handlers.callbacks import router as callbacks_router
+
+__all__ = ['commands_router', 'callbacks_router']
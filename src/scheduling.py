@@ -0,0 +1,74 @@
+"""
+Адаптивное расписание скрапинга магазинов
+
+У каждого магазина свой интервал обновления: он сокращается для магазинов,
+страницы которых часто меняются, и растет для неизменных. Основа - история
+выполненных заданий очереди (см. job_queue.get_scrape_history).
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, Tuple
+
+from config.settings import settings
+
+# Вес каждого следующего (более старого) задания истории
+HISTORY_DECAY = 0.7
+
+
+def change_rate(history: Sequence[Tuple[datetime, int]]) -> Optional[float]:
+    """
+    Доля запусков, в которых магазин изменился (0..1), с большим весом
+    последних запусков; None - истории еще нет
+    """
+    if not history:
+        return None
+    weight = 1.0
+    total = changed = 0.0
+    for _, saved in history:
+        total += weight
+        if saved:
+            changed += weight
+        weight *= HISTORY_DECAY
+    return changed / total
+
+
+def adaptive_interval(history: Sequence[Tuple[datetime, int]]) -> timedelta:
+    """
+    Интервал обновления магазина
+    
+    Без истории - SCRAPE_INTERVAL_HOURS. Иначе интервал между
+    SCRAPE_MIN_INTERVAL_HOURS (меняется при каждом запуске) и
+    SCRAPE_MAX_INTERVAL_HOURS (не меняется) в геометрической шкале.
+    """
+    low = settings.SCRAPE_MIN_INTERVAL_HOURS
+    high = max(low, settings.SCRAPE_MAX_INTERVAL_HOURS)
+    rate = change_rate(history)
+    if rate is None:
+        hours = min(max(settings.SCRAPE_INTERVAL_HOURS, low), high)
+    else:
+        hours = low * (high / low) ** (1 - rate)
+    return timedelta(hours=hours)
+
+
+def first_run_delay(history: Sequence[Tuple[datetime, int]], interval: timedelta) -> float:
+    """
+    Задержка (сек) до первого запуска после старта бота
+    
+    Магазин, обновленный недавно, ждет остаток интервала; просроченные
+    запускаются со случайным сдвигом до SCRAPE_JITTER_SECONDS, чтобы
+    не обходить все магазины в одну секунду.
+    """
+    jitter = random.uniform(0, settings.SCRAPE_JITTER_SECONDS)
+    if not history or history[0][0] is None:
+        return jitter
+    remaining = (history[0][0] + interval - datetime.utcnow()).total_seconds()
+    return max(0.0, remaining) + jitter
+
+
+def describe(history: Sequence[Tuple[datetime, int]], interval: timedelta) -> str:
+    """Краткое описание расписания магазина для журнала"""
+    rate = change_rate(history)
+    changes = "нет истории" if rate is None else f"изменения {rate:.0%} из {len(history)}"
+    return f"каждые {interval.total_seconds() / 3600:.1f} ч ({changes})"
+
@@ -1,5 +1,10 @@
-"""Scrapers Package"""
-from src.scrapers.base import BaseScraper
-from src.scrapers.discount_scraper import DiscountScraper
-
-__all__ = ['BaseScraper', 'DiscountScraper']
+"""Scrapers Package"""
+from src.scrapers.base import BaseScraper
+from src.scrapers.discount_scraper import DiscountScraper
+from src.scrapers.http_client import HttpClient
+from src.scrapers.specs import SpecScraper, StoreSpec, load_store_specs
+
+__all__ = [
+    'BaseScraper', 'DiscountScraper', 'HttpClient',
+    'SpecScraper', 'StoreSpec', 'load_store_specs'
+]
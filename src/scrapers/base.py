@@ -1,74 +1,201 @@
-"""
-Базовый класс скрапера
-"""
-
-import logging
-from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-import aiohttp
-from bs4 import BeautifulSoup
-
-logger = logging.getLogger(__name__)
-
-
-class BaseScraper(ABC):
-    """Базовый класс для всех скраперов"""
-    
-    def __init__(self, base_url: str, store_name: str, category: str):
-        self.base_url = base_url
-        self.store_name = store_name
-        self.category = category
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-        }
-        
-    async def fetch_page(self, url: str) -> Optional[str]:
-        """Загрузка HTML страницы"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers, timeout=30) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        logger.warning(f"Ошибка загрузки {url}: статус {response.status}")
-                        return None
-        except Exception as e:
-            logger.error(f"Ошибка при загрузке страницы {url}: {e}")
-            return None
-            
-    def parse_html(self, html: str) -> BeautifulSoup:
-        """Парсинг HTML"""
-        return BeautifulSoup(html, 'html.parser')
-    
-    @abstractmethod
-    async def scrape_discounts(self) -> List[Dict[str, Any]]:
-        """
-        Получение списка скидок
-        
-        Returns:
-            List[Dict]: Список скидок в формате:
-            [
-                {
-                    'title': 'Название товара',
-                    'old_price': 10.99,
-                    'new_price': 7.99,
-                    'discount_percent': 27,
-                    'image_url': 'https://...',
-                    'product_url': 'https://...',
-                    'valid_until': datetime,
-                    'city': 'Минск',
-                    'store_name': 'Евроопт',
-                    'category': 'grocery'
-                }
-            ]
-        """
-        pass
-    
-    def calculate_discount_percent(self, old_price: float, new_price: float) -> int:
-        """Расчет процента скидки"""
-        if old_price <= 0:
-            return 0
-        discount = ((old_price - new_price) / old_price) * 100
-        return int(round(discount))
+"""
+Базовый класс скрапера
+"""
+
+import sys
+import asyncio
+import logging
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Optional, Union, Sequence, Set, Tuple, AsyncIterator
+from bs4 import BeautifulSoup
+
+from config.settings import settings
+from src.database.records import DiscountRecord
+from src.scrapers.dedup import DuplicateFilter, product_identities
+from src.scrapers.http_client import HttpClient, FetchResult
+from src.scrapers.parsing import FieldSpec, extract_page, parse_page
+from src.scrapers.prices import parse_price
+
+logger = logging.getLogger(__name__)
+
+# Пул процессов для парсинга HTML (создается при первом использовании)
+_parse_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_executor() -> Optional[ProcessPoolExecutor]:
+    """Общий пул процессов парсинга; None, если PARSE_WORKERS = 0"""
+    global _parse_executor
+    if _parse_executor is None and settings.PARSE_WORKERS > 0:
+        # spawn: fork из процесса с работающим циклом событий и потоками
+        # (aiosqlite, планировщик) копирует их блокировки в дочерние процессы
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=settings.PARSE_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _parse_executor
+
+
+def shutdown_parse_executor():
+    """Остановка пула процессов парсинга"""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=True, cancel_futures=True)
+        _parse_executor = None
+
+
+class BaseScraper(ABC):
+    """Базовый класс для всех скраперов"""
+    
+    # Города, где доступен магазин: список или "all" (вся Беларусь)
+    cities: Union[List[str], str] = ["Минск"]
+    
+    # Бэкенд парсинга магазина (None - settings.HTML_PARSER), см. parsing.PARSERS
+    parser: Optional[str] = None
+    
+    # Срок действия скидок магазина (дней)
+    valid_days: int = 7
+    
+    def __init__(
+        self,
+        base_url: str,
+        store_name: str,
+        category: str,
+        http_client: Optional[HttpClient] = None
+    ):
+        self.base_url = base_url
+        # Интернированные строки: все скидки магазина ссылаются на один объект
+        self.store_name = sys.intern(store_name)
+        self.category = sys.intern(category)
+        # Общий HTTP клиент назначается DiscountScraper, собственный - запасной вариант
+        self.http_client = http_client or HttpClient()
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+        }
+        # Отпечатки прошлого запуска (заполняет DiscountScraper перед обходом):
+        # активные скидки магазина и страницы (URL -> запись page_fingerprints)
+        self.known_fingerprints: Set[str] = set()
+        self.page_state: Dict[str, Dict[str, Any]] = {}
+        # Результат обхода: отпечатки неизменившихся скидок, новые записи страниц
+        self.unchanged_fingerprints: Set[str] = set()
+        self.page_updates: Dict[str, Dict[str, Any]] = {}
+        # Сколько страниц пропущено без разбора в текущем обходе
+        self.unchanged_pages = 0
+        # Уже встреченные товары обхода и число отброшенных повторов
+        self.duplicates = DuplicateFilter()
+        # Адреса акций, первая страница которых не загрузилась: обход неполный
+        self.failed_urls: List[str] = []
+    
+    async def fetch_page(self, url: str) -> Optional[str]:
+        """Загрузка HTML страницы"""
+        return await self.http_client.fetch(url, headers=self.headers)
+    
+    async def fetch_page_result(self, url: str) -> Optional[FetchResult]:
+        """Загрузка страницы с хэшем ее содержимого"""
+        return await self.http_client.fetch_result(url, headers=self.headers)
+    
+    def parse_html(self, html: str) -> BeautifulSoup:
+        """Парсинг HTML"""
+        return parse_page(html, self.parser or settings.HTML_PARSER)
+    
+    async def extract_cards(
+        self,
+        html: str,
+        card_selector: str,
+        fields: Sequence[FieldSpec]
+    ) -> List[Tuple[Optional[str], ...]]:
+        """
+        Извлечение полей карточек товаров вне event loop
+        
+        Разбор HTML занимает процессор, поэтому выполняется в пуле процессов,
+        чтобы бот продолжал отвечать пользователям во время скрапинга.
+        
+        Args:
+            card_selector: CSS-селектор карточки товара
+            fields: Поля карточки в виде (селектор, атрибут или None для текста)
+        """
+        cards, _ = await self.extract_page(html, card_selector, fields)
+        return cards
+    
+    async def extract_page(
+        self,
+        html: str,
+        card_selector: str,
+        fields: Sequence[FieldSpec],
+        next_selector: Optional[str] = None
+    ) -> Tuple[List[Tuple[Optional[str], ...]], Optional[str]]:
+        """
+        Извлечение карточек и ссылки на следующую страницу (в пуле процессов)
+        
+        Returns:
+            Tuple: (карточки, href следующей страницы или None)
+        """
+        parse = partial(
+            extract_page, html, card_selector, tuple(fields),
+            self.parser or settings.HTML_PARSER, next_selector
+        )
+        
+        executor = get_parse_executor()
+        if executor is None:
+            return parse()
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, parse)
+    
+    async def iter_discounts(self) -> AsyncIterator[DiscountRecord]:
+        """
+        Потоковое получение скидок: каждая скидка отдается сразу после
+        разбора ее страницы, не дожидаясь обхода всего магазина.
+        
+        По умолчанию - обертка над scrape_discounts; скраперы с пагинацией
+        переопределяют этот метод. Повторы товара в пределах обхода
+        отбрасываются (см. dedup.py).
+        """
+        self.duplicates.reset()
+        for discount in await self.scrape_discounts():
+            if not isinstance(discount, DiscountRecord):
+                discount = DiscountRecord.from_mapping(discount)
+            if not self.duplicates.is_duplicate(product_identities(discount.product_url, discount.title)):
+                yield discount
+    
+    @abstractmethod
+    async def scrape_discounts(self) -> List[Union[DiscountRecord, Dict[str, Any]]]:
+        """
+        Получение списка скидок
+        
+        Returns:
+            List[DiscountRecord]: Список скидок; для простоты допускаются
+            и словари с теми же полями:
+            [
+                {
+                    'title': 'Название товара',
+                    'old_price': 10.99,
+                    'new_price': 7.99,
+                    'discount_percent': 27,
+                    'image_url': 'https://...',
+                    'product_url': 'https://...',
+                    'valid_until': datetime,
+                    'store_name': 'Евроопт',
+                    'category': 'grocery'
+                }
+            ]
+            
+            Город в скидке не указывается: доступность по городам задается
+            атрибутом cities на уровне магазина.
+        """
+        pass
+    
+    def parse_price(self, price_text: Optional[str]) -> float:
+        """Парсинг цены из текста (0.0, если не удалось), см. prices.parse_price"""
+        return parse_price(price_text)
+    
+    def calculate_discount_percent(self, old_price: float, new_price: float) -> int:
+        """Расчет процента скидки"""
+        if old_price <= 0:
+            return 0
+        discount = ((old_price - new_price) / old_price) * 100
+        return int(round(discount))
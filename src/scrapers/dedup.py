@@ -0,0 +1,67 @@
+"""
+Устранение повторов товаров в пределах одного обхода магазина
+
+Селекторы карточек вида ".product-card, .special-item" совпадают и с
+вложенными элементами, а один товар бывает на нескольких страницах акций.
+Повторы отбрасываются до разбора цен и записи в БД по ключам товара:
+адресу страницы товара и названию. Название - ключ записи скидки в БД
+(store_id, title): две карточки с одним названием записались бы в одну
+строку, и отпечаток одной из них никогда не оказался бы среди сохраненных.
+"""
+
+from typing import Hashable, Iterable, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Параметры ссылок, не влияющие на товар (метки рекламных кампаний и т.п.)
+_TRACKING_PARAMS = {'from', 'ref', 'yclid', 'gclid', 'fbclid'}
+
+
+def normalize_url(url: str) -> str:
+    """Адрес товара без фрагмента, меток кампаний и завершающего слэша"""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not (key.lower().startswith('utm_') or key.lower() in _TRACKING_PARAMS)
+    )
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip('/') or '/',
+        urlencode(query),
+        ''
+    ))
+
+
+def product_identities(product_url: Optional[str], title: Optional[str]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Ключи товара: нормализованный адрес и название в том виде, в каком
+    оно записывается в БД (пустой кортеж - товар не опознать)
+    """
+    keys = []
+    if product_url:
+        keys.append(('url', normalize_url(product_url)))
+    if title:
+        keys.append(('title', title))
+    return tuple(keys)
+
+
+class DuplicateFilter:
+    """Множество уже встреченных товаров обхода и счетчик отброшенных повторов"""
+    
+    def __init__(self):
+        self.seen: Set[Hashable] = set()
+        self.dropped = 0
+    
+    def reset(self):
+        """Начало нового обхода"""
+        self.seen = set()
+        self.dropped = 0
+    
+    def is_duplicate(self, identities: Iterable[Hashable]) -> bool:
+        """True, если встречался любой из ключей товара (повтор учитывается в dropped)"""
+        identities = tuple(identities)
+        if any(identity in self.seen for identity in identities):
+            self.dropped += 1
+            return True
+        self.seen.update(identities)
+        return False
@@ -1,99 +1,249 @@
-"""
-Главный модуль скрапинга скидок
-"""
-
-import logging
-from typing import List, Dict, Any
-from datetime import datetime
-
-from src.scrapers.grocery import EvrooptScraper, GreenScraper
-from src.scrapers.electronics import A21VekScraper
-from src.scrapers.clothing import MileScraper
-from src.database.crud import save_discount, get_store_by_name, create_store
-
-logger = logging.getLogger(__name__)
-
-
-class DiscountScraper:
-    """Главный класс для сбора скидок со всех источников"""
-    
-    def __init__(self):
-        # Инициализация всех скраперов
-        self.scrapers = [
-            # Продуктовые магазины
-            EvrooptScraper(),
-            GreenScraper(),
-            # Техника
-            A21VekScraper(),
-            # Одежда
-            MileScraper(),
-        ]
-        
-    async def update_all_discounts(self) -> int:
-        """
-        Обновление скидок со всех источников
-        
-        Returns:
-            int: Количество сохраненных скидок
-        """
-        total_saved = 0
-        
-        for scraper in self.scrapers:
-            try:
-                logger.info(f"Получение скидок от {scraper.store_name}...")
-                discounts = await scraper.scrape_discounts()
-                
-                for discount_data in discounts:
-                    try:
-                        # Получаем или создаем магазин
-                        store = await get_store_by_name(discount_data['store_name'])
-                        if not store:
-                            store = await create_store(
-                                name=discount_data['store_name'],
-                                category=discount_data['category'],
-                                website=scraper.base_url
-                            )
-                        
-                        # Сохраняем скидку
-                        await save_discount(
-                            store_id=store.id,
-                            title=discount_data['title'],
-                            old_price=discount_data['old_price'],
-                            new_price=discount_data['new_price'],
-                            discount_percent=discount_data['discount_percent'],
-                            image_url=discount_data.get('image_url'),
-                            product_url=discount_data.get('product_url'),
-                            valid_until=discount_data.get('valid_until'),
-                            city=discount_data.get('city', 'Минск')
-                        )
-                        total_saved += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Ошибка сохранения скидки: {e}")
-                        continue
-                        
-                logger.info(f"Получено {len(discounts)} скидок от {scraper.store_name}")
-                
-            except Exception as e:
-                logger.error(f"Ошибка при получении скидок от {scraper.store_name}: {e}")
-                continue
-        
-        logger.info(f"Всего сохранено скидок: {total_saved}")
-        return total_saved
-    
-    async def get_discounts_by_category(self, category: str) -> List[Dict[str, Any]]:
-        """Получение скидок по категории"""
-        all_discounts = []
-        
-        for scraper in self.scrapers:
-            if scraper.category == category:
-                try:
-                    discounts = await scraper.scrape_discounts()
-                    all_discounts.extend(discounts)
-                except Exception as e:
-                    logger.error(f"Ошибка скрапинга {scraper.store_name}: {e}")
-                    
-        # Сортировка по проценту скидки (лучшие первыми)
-        all_discounts.sort(key=lambda x: x.get('discount_percent', 0), reverse=True)
-        
-        return all_discounts
+"""
+Главный модуль скрапинга скидок
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Collection
+from urllib.parse import urlparse
+
+from config.settings import settings
+from src.scrapers.base import BaseScraper, shutdown_parse_executor
+from src.scrapers.specs import SpecScraper, load_store_specs
+from src.scrapers.fixtures import create_http_client
+from src.scrapers.pipeline import IngestPipeline
+from src.database.crud import (
+    resolve_store_id,
+    set_store_cities,
+    rebuild_leaderboard,
+    get_discount_fingerprints,
+    touch_discounts,
+    get_page_fingerprints,
+    save_page_fingerprints
+)
+from src.database.query_cache import query_cache
+from src.database.records import DiscountRecord
+
+logger = logging.getLogger(__name__)
+
+
+class DiscountScraper:
+    """Главный класс для сбора скидок со всех источников"""
+    
+    def __init__(self):
+        # Скраперы включенных магазинов из файла описаний (settings.STORES_FILE)
+        self.scrapers: List[BaseScraper] = [
+            SpecScraper(spec) for spec in load_store_specs() if spec.enabled
+        ]
+        
+        # Общий пул HTTP соединений для всех скраперов (или фикстуры, см. fixtures.py)
+        self.http_client = create_http_client()
+        for scraper in self.scrapers:
+            scraper.http_client = self.http_client
+        
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Длительность обработки каждого магазина в последнем запуске (сек)
+        self.last_run_durations: Dict[str, float] = {}
+        # Отброшенные повторы товаров по магазинам в последнем запуске
+        self.last_run_duplicates: Dict[str, int] = {}
+        # Ошибки магазинов в последнем запуске (имя -> описание)
+        self.last_run_errors: Dict[str, str] = {}
+        
+    async def close(self):
+        """Освобождение сетевых ресурсов и пула парсинга"""
+        await self.http_client.close()
+        shutdown_parse_executor()
+        
+    async def update_all_discounts(
+        self,
+        concurrent: Optional[bool] = None,
+        stores: Optional[Collection[str]] = None,
+        leaderboard: bool = True
+    ) -> int:
+        """
+        Обновление скидок со всех источников
+        
+        Args:
+            concurrent: Запускать скраперы параллельно
+                (по умолчанию settings.SCRAPE_CONCURRENT)
+            stores: Имена магазинов для обновления (None - все)
+            leaderboard: Перестроить топ скидок после записи
+                (обработчик очереди перестраивает его, когда очередь опустеет)
+        
+        Returns:
+            int: Количество сохраненных скидок
+        """
+        if concurrent is None:
+            concurrent = settings.SCRAPE_CONCURRENT
+        scrapers = [
+            scraper for scraper in self.scrapers
+            if stores is None or scraper.store_name in stores
+        ]
+        
+        self.last_run_durations = {}
+        self.last_run_duplicates = {}
+        self.last_run_errors = {}
+        started = time.perf_counter()
+        
+        # Скраперы только собирают скидки, запись в БД идет в отдельной задаче
+        pipeline = IngestPipeline()
+        pipeline.start()
+        
+        try:
+            if concurrent:
+                # Глобальный лимит одновременно работающих скраперов
+                global_semaphore = asyncio.Semaphore(settings.SCRAPE_MAX_CONCURRENCY)
+                await asyncio.gather(*(
+                    self._scrape_store_bounded(scraper, pipeline, global_semaphore)
+                    for scraper in scrapers
+                ))
+            else:
+                for scraper in scrapers:
+                    await self._scrape_store(scraper, pipeline)
+        finally:
+            total_saved = await pipeline.close()
+        
+        # Магазин с потерянными при записи пакетами обновлен не полностью
+        for store_name, error in pipeline.errors.items():
+            self.last_run_errors.setdefault(store_name, f"Ошибка записи скидок: {error}")
+        
+        # Финальный этап: предрасчитанный топ для обработчиков бота
+        # (если ни одна скидка не записана, прежний топ остается актуальным)
+        if total_saved and leaderboard:
+            try:
+                entries = await rebuild_leaderboard()
+                logger.info(f"Топ скидок перестроен: {entries} позиций")
+            except Exception as e:
+                logger.error(f"Ошибка построения топа скидок: {e}")
+        
+        elapsed = time.perf_counter() - started
+        
+        for store_name, duration in sorted(
+            self.last_run_durations.items(), key=lambda item: item[1], reverse=True
+        ):
+            logger.info(f"{store_name}: {duration:.2f} с")
+        logger.info(
+            f"Всего сохранено скидок: {total_saved} за {elapsed:.2f} с "
+            f"(сумма по магазинам {sum(self.last_run_durations.values()):.2f} с), "
+            f"отброшено повторов {sum(self.last_run_duplicates.values())}"
+        )
+        logger.info(f"Кэш запросов скидок: {query_cache.stats()}")
+        return total_saved
+    
+    async def _scrape_store_bounded(
+        self,
+        scraper: BaseScraper,
+        pipeline: IngestPipeline,
+        global_semaphore: asyncio.Semaphore
+    ) -> int:
+        """Скрапинг магазина с учетом глобального лимита и лимита на хост"""
+        host_semaphore = self._get_host_semaphore(scraper.base_url)
+        async with global_semaphore:
+            async with host_semaphore:
+                return await self._scrape_store(scraper, pipeline)
+    
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Семафор для хоста магазина"""
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                settings.SCRAPE_MAX_CONCURRENCY_PER_HOST
+            )
+        return self._host_semaphores[host]
+    
+    async def _scrape_store(self, scraper: BaseScraper, pipeline: IngestPipeline) -> int:
+        """
+        Получение скидок одного магазина и передача их в конвейер записи
+        
+        Returns:
+            int: Количество полученных скидок
+        """
+        count = 0
+        started = time.perf_counter()
+        
+        try:
+            logger.info(f"Получение скидок от {scraper.store_name}...")
+            # Города задаются один раз на магазин, а не копией каждой скидки
+            store_id = await resolve_store_id(
+                name=scraper.store_name,
+                category=scraper.category,
+                website=scraper.base_url
+            )
+            await set_store_cities(store_id, scraper.cities)
+            # Отпечатки прошлого запуска: неизменившиеся страницы и карточки
+            # не разбираются и не перезаписываются
+            scraper.known_fingerprints = await get_discount_fingerprints(store_id)
+            scraper.page_state = await get_page_fingerprints(store_id)
+            
+            async def consume():
+                # Скидки уходят в конвейер по мере разбора страниц,
+                # запись в БД начинается до окончания обхода магазина
+                nonlocal count
+                async for discount in scraper.iter_discounts():
+                    await pipeline.put(scraper, discount)
+                    count += 1
+            
+            await asyncio.wait_for(consume(), timeout=settings.SCRAPE_STORE_TIMEOUT)
+            if scraper.failed_urls:
+                # Задание магазина завершится ошибкой и будет повторено,
+                # а не попадет в историю как "без изменений"
+                message = f"Не удалось загрузить страницы акций: {', '.join(scraper.failed_urls)}"
+                logger.error(f"{scraper.store_name}: {message}")
+                self.last_run_errors[scraper.store_name] = message
+            
+            # Страницы запоминаются как разобранные, только когда все их
+            # скидки записаны: иначе потерянные скидки не вернутся, пока
+            # страница не изменится
+            write_error = await pipeline.flush(scraper.store_name)
+            if write_error is None:
+                await save_page_fingerprints(store_id, scraper.page_updates)
+            else:
+                logger.warning(
+                    f"{scraper.store_name}: не все скидки записаны, "
+                    f"отпечатки страниц не сохранены"
+                )
+            if scraper.unchanged_fingerprints:
+                touched = await touch_discounts(
+                    store_id,
+                    scraper.unchanged_fingerprints,
+                    datetime.now() + timedelta(days=scraper.valid_days)
+                )
+                logger.info(
+                    f"{scraper.store_name}: без изменений страниц {scraper.unchanged_pages}, "
+                    f"скидок {touched}"
+                )
+            
+            logger.info(f"Получено {count} скидок от {scraper.store_name}")
+            if scraper.duplicates.dropped:
+                logger.info(f"{scraper.store_name}: отброшено повторов товаров {scraper.duplicates.dropped}")
+            self.last_run_duplicates[scraper.store_name] = scraper.duplicates.dropped
+            
+        except asyncio.TimeoutError:
+            message = f"Превышено время ожидания ({settings.SCRAPE_STORE_TIMEOUT} с)"
+            logger.error(f"{message} для {scraper.store_name}")
+            self.last_run_errors[scraper.store_name] = message
+        except Exception as e:
+            logger.error(f"Ошибка при получении скидок от {scraper.store_name}: {e}")
+            self.last_run_errors[scraper.store_name] = str(e) or type(e).__name__
+        finally:
+            self.last_run_durations[scraper.store_name] = time.perf_counter() - started
+        
+        return count
+    
+    async def get_discounts_by_category(self, category: str) -> List[DiscountRecord]:
+        """Получение скидок по категории"""
+        all_discounts = []
+        
+        for scraper in self.scrapers:
+            if scraper.category == category:
+                try:
+                    all_discounts.extend([discount async for discount in scraper.iter_discounts()])
+                except Exception as e:
+                    logger.error(f"Ошибка скрапинга {scraper.store_name}: {e}")
+                    
+        # Сортировка по проценту скидки (лучшие первыми)
+        all_discounts.sort(key=lambda discount: discount.discount_percent or 0, reverse=True)
+        
+        return all_discounts
@@ -0,0 +1,133 @@
+"""
+Запись и воспроизведение HTTP ответов для офлайн прогонов скраперов
+
+В режиме записи ответы реальных сайтов сохраняются в каталог фикстур,
+в режиме воспроизведения отдаются из него без сети - с необязательной
+задержкой и случайными ошибками. Ограничение частоты, повторы и
+предохранитель HttpClient при этом работают как с настоящими сайтами.
+"""
+
+import json
+import random
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import aiohttp
+from multidict import CIMultiDict
+
+from config.settings import settings
+from src.scrapers.http_client import HttpClient, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_RECORD = "record"
+FIXTURES_REPLAY = "replay"
+
+# Заголовки ответа, сохраняемые в фикстуре
+_KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+
+class FixtureStore:
+    """Каталог фикстур: один JSON файл на URL (статус, заголовки, тело)"""
+    
+    def __init__(self, directory: Union[str, Path, None] = None):
+        self.directory = Path(directory or settings.HTTP_FIXTURES_DIR)
+    
+    def path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+    
+    def load(self, url: str) -> Optional[HttpResponse]:
+        """Записанный ответ или None"""
+        try:
+            with open(self.path(url), encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        return HttpResponse(data['status'], data['text'], CIMultiDict(data['headers']))
+    
+    def save(self, url: str, response: HttpResponse):
+        """Сохранение ответа"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers}
+        with open(self.path(url), 'w', encoding='utf-8') as f:
+            json.dump({
+                'url': url,
+                'status': response.status,
+                'headers': headers,
+                'text': response.text
+            }, f, ensure_ascii=False)
+
+
+class RecordingHttpClient(HttpClient):
+    """HTTP клиент, сохраняющий каждый полученный ответ в фикстуры"""
+    
+    def __init__(self, store: Optional[FixtureStore] = None):
+        super().__init__()
+        # Кэш отключен: условные запросы дали бы 304 без тела вместо фикстуры
+        self.cache = None
+        self.store = store or FixtureStore()
+    
+    async def _send(self, url: str, headers: Dict[str, str]) -> HttpResponse:
+        response = await super()._send(url, headers)
+        if response.text is not None:
+            await asyncio.to_thread(self.store.save, url, response)
+        return response
+
+
+class ReplayHttpClient(HttpClient):
+    """
+    HTTP клиент, отдающий ответы из фикстур без обращения к сети.
+    
+    Args:
+        latency: Задержка ответа, сек (случайная в пределах ±50%)
+        error_rate: Доля запросов, завершающихся ошибкой сети или ответом 503
+        seed: Зерно генератора для воспроизводимых задержек и ошибок
+    """
+    
+    def __init__(
+        self,
+        store: Optional[FixtureStore] = None,
+        latency: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        super().__init__()
+        self.cache = None
+        self.store = store or FixtureStore()
+        self.latency = settings.HTTP_REPLAY_LATENCY if latency is None else latency
+        self.error_rate = settings.HTTP_REPLAY_ERROR_RATE if error_rate is None else error_rate
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.missing = 0
+    
+    async def _send(self, url: str, headers: Dict[str, str]) -> HttpResponse:
+        self.requests += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * self._random.uniform(0.5, 1.5))
+        
+        if self._random.random() < self.error_rate:
+            if self._random.random() < 0.5:
+                raise aiohttp.ClientConnectionError(f"Ошибка, внесенная при воспроизведении: {url}")
+            return HttpResponse(503, '', CIMultiDict())
+        
+        response = self.store.load(url)
+        if response is None:
+            self.missing += 1
+            logger.debug(f"Нет фикстуры для {url}")
+            return HttpResponse(404, '', CIMultiDict())
+        return response
+
+
+def create_http_client() -> HttpClient:
+    """HTTP клиент для скраперов с учетом HTTP_FIXTURES_MODE"""
+    mode = settings.HTTP_FIXTURES_MODE
+    if mode == FIXTURES_RECORD:
+        logger.info(f"Запись HTTP ответов в {settings.HTTP_FIXTURES_DIR}")
+        return RecordingHttpClient()
+    if mode == FIXTURES_REPLAY:
+        logger.info(f"Воспроизведение HTTP ответов из {settings.HTTP_FIXTURES_DIR}")
+        return ReplayHttpClient()
+    return HttpClient()
@@ -0,0 +1,165 @@
+"""
+Дисковый кэш HTTP страниц для условных запросов
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union, NamedTuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedPage(NamedTuple):
+    """Сохраненная страница: валидаторы, хэш содержимого и тело"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    text: str
+
+
+def content_hash(text: str) -> str:
+    """Хэш содержимого страницы"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class HttpCache:
+    """
+    Кэш страниц на диске: для каждого URL хранятся ETag, Last-Modified,
+    хэш и тело ответа.
+    
+    Файлы: <ключ>.json (метаданные) и <ключ>.html (тело). Общий размер
+    ограничен max_bytes, при превышении удаляются давно не читавшиеся записи.
+    Операции с файлами выполняются в потоке, чтобы не блокировать event loop.
+    """
+    
+    def __init__(self, directory: Union[str, Path, None] = None, max_bytes: Optional[int] = None):
+        self.directory = Path(directory or settings.HTTP_CACHE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.HTTP_CACHE_MAX_MB * 1024 * 1024
+        # ключ -> (размер в байтах, время последнего доступа), строится при первом обращении
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total_bytes = 0
+        # Индекс меняется из потоков asyncio.to_thread
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+    
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.directory / f"{key}.json", self.directory / f"{key}.html"
+    
+    async def get(self, url: str) -> Optional[CachedPage]:
+        """Сохраненная страница или None"""
+        return await asyncio.to_thread(self._locked, self._get, url)
+    
+    async def set(
+        self,
+        url: str,
+        text: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        page_hash: Optional[str] = None
+    ):
+        """Сохранение страницы и вытеснение старых записей сверх лимита"""
+        await asyncio.to_thread(
+            self._locked, self._set, url, text, etag, last_modified, page_hash or content_hash(text)
+        )
+    
+    def _locked(self, method, *args):
+        with self._lock:
+            return method(*args)
+    
+    def _load_index(self):
+        if self._index is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._index = {}
+        self._total_bytes = 0
+        for meta_path in self.directory.glob('*.json'):
+            body_path = meta_path.with_suffix('.html')
+            try:
+                stat = body_path.stat()
+                size = stat.st_size + meta_path.stat().st_size
+            except OSError:
+                continue
+            self._index[meta_path.stem] = (size, stat.st_mtime)
+            self._total_bytes += size
+    
+    def _get(self, url: str) -> Optional[CachedPage]:
+        self._load_index()
+        key = self._key(url)
+        if key not in self._index:
+            return None
+        
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            text = body_path.read_text(encoding='utf-8')
+        except (OSError, ValueError) as e:
+            logger.debug(f"Запись кэша {url} повреждена: {e}")
+            self._remove(key)
+            return None
+        
+        size, _ = self._index[key]
+        self._index[key] = (size, time.time())
+        return CachedPage(meta.get('etag'), meta.get('last_modified'), meta['content_hash'], text)
+    
+    def _set(self, url: str, text: str, etag: Optional[str], last_modified: Optional[str], page_hash: str):
+        self._load_index()
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        meta = json.dumps({
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': page_hash
+        }, ensure_ascii=False)
+        body = text.encode('utf-8')
+        
+        try:
+            _write_atomic(body_path, body)
+            _write_atomic(meta_path, meta.encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить {url} в кэш: {e}")
+            return
+        
+        old_size, _ = self._index.get(key, (0, 0.0))
+        size = len(body) + len(meta.encode('utf-8'))
+        self._index[key] = (size, time.time())
+        self._total_bytes += size - old_size
+        self._evict()
+    
+    def _evict(self):
+        """Удаление давно не читавшихся записей сверх лимита размера"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+    
+    def _remove(self, key: str):
+        size, _ = self._index.pop(key, (0, 0.0))
+        self._total_bytes -= size
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Запись через временный файл, чтобы не оставить обрезанную запись"""
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
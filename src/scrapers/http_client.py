@@ -0,0 +1,291 @@
+"""
+Общий HTTP клиент для скраперов
+"""
+
+import re
+import codecs
+import asyncio
+import logging
+from typing import Dict, Mapping, Optional, NamedTuple, Tuple
+from urllib.parse import urlparse
+import aiohttp
+from multidict import CIMultiDict
+
+from config.settings import settings
+from src.scrapers.http_cache import HttpCache, content_hash
+from src.scrapers.throttling import TokenBucket, CircuitBreaker, backoff_delay, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Статусы временной недоступности, при которых запрос повторяется
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# brotli распаковывается aiohttp, только если установлен пакет Brotli
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+# Размер порции при потоковом чтении тела ответа
+CHUNK_SIZE = 64 * 1024
+# Кодировка из <meta charset> / http-equiv в начале страницы
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+class FetchResult(NamedTuple):
+    """Загруженная страница"""
+    text: str
+    content_hash: str
+
+
+class HttpResponse(NamedTuple):
+    """Ответ на одну попытку запроса"""
+    status: int
+    # Тело ответа 200 (None - страница превысила HTTP_MAX_PAGE_BYTES), иначе ''
+    text: Optional[str]
+    headers: Mapping[str, str]
+
+
+class HttpClient:
+    """
+    HTTP клиент с общим пулом соединений.
+    
+    Одна сессия aiohttp переиспользуется всеми скраперами: keep-alive
+    соединения, лимиты на хост и кэш DNS сохраняются между запросами.
+    """
+    
+    def __init__(self, cache: Optional[HttpCache] = None):
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Кэш страниц для условных запросов (None - без кэша)
+        if cache is None and settings.HTTP_CACHE_ENABLED:
+            cache = HttpCache()
+        self.cache = cache
+        # Ограничение частоты и предохранители по хостам
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Получить (или лениво создать) общую сессию"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                use_dns_cache=True,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'Accept-Encoding': ACCEPT_ENCODING},
+                timeout=aiohttp.ClientTimeout(
+                    total=settings.REQUEST_TIMEOUT,
+                    sock_connect=settings.HTTP_CONNECT_TIMEOUT
+                )
+            )
+        return self._session
+    
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Загрузка страницы через общий пул соединений"""
+        result = await self.fetch_result(url, headers)
+        return result.text if result else None
+    
+    async def fetch_result(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Optional[FetchResult]:
+        """
+        Загрузка страницы с условным запросом к сохраненной в кэше версии
+        
+        С валидаторами из кэша отправляются If-None-Match / If-Modified-Since;
+        на ответ 304 тело берется из кэша без повторной загрузки.
+        """
+        cached = await self.cache.get(url) if self.cache else None
+        request_headers = dict(headers or {})
+        if cached:
+            if cached.etag:
+                request_headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                request_headers['If-Modified-Since'] = cached.last_modified
+        
+        response_data = await self._request(url, request_headers)
+        if response_data is None:
+            return None
+        
+        status, text, etag, last_modified = response_data
+        if status == 304:
+            if cached:
+                return FetchResult(cached.text, cached.content_hash)
+            logger.warning(f"Ошибка загрузки {url}: ответ 304 без сохраненной копии")
+            return None
+        
+        page_hash = content_hash(text)
+        # Та же страница с теми же валидаторами не перезаписывается в кэш
+        unchanged = (
+            cached is not None and cached.content_hash == page_hash
+            and cached.etag == etag and cached.last_modified == last_modified
+        )
+        if self.cache and not unchanged:
+            await self.cache.set(url, text, etag, last_modified, page_hash)
+        
+        return FetchResult(text, page_hash)
+    
+    async def _request(
+        self,
+        url: str,
+        headers: Dict[str, str]
+    ) -> Optional[Tuple[int, str, Optional[str], Optional[str]]]:
+        """
+        GET-запрос с ограничением частоты, повторами и предохранителем хоста
+        
+        Ошибки сети и ответы 429/5xx повторяются до HTTP_RETRIES раз
+        с экспоненциальной задержкой. Retry-After, если сервер его прислал,
+        выдерживается полностью; больше HTTP_BACKOFF_MAX - запрос не повторяется.
+        
+        Returns:
+            Tuple: (статус 200 или 304, тело, ETag, Last-Modified) или None
+        """
+        host = urlparse(url).netloc
+        breaker = self._get_breaker(host)
+        bucket = self._get_bucket(host)
+        
+        for attempt in range(settings.HTTP_RETRIES + 1):
+            if not breaker.allow():
+                logger.warning(f"Хост {host} недоступен, запрос {url} пропущен")
+                return None
+            # Открытый предохранитель пропустил запрос - это пробная попытка
+            trial = breaker.is_open
+            
+            retry_after = None
+            try:
+                await bucket.acquire()
+                response = await self._send(url, headers)
+                if response.status in (200, 304):
+                    breaker.record_success()
+                    if response.text is None:
+                        return None
+                    return (
+                        response.status,
+                        response.text,
+                        response.headers.get('ETag'),
+                        response.headers.get('Last-Modified')
+                    )
+                
+                if response.status not in RETRY_STATUSES:
+                    # Хост отвечает - ошибка страницы, а не хоста
+                    breaker.record_success()
+                    logger.warning(f"Ошибка загрузки {url}: статус {response.status}")
+                    return None
+                
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                error = f"статус {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            except asyncio.CancelledError:
+                # Отмена (таймаут обхода магазина) - не ошибка хоста: в счетчик
+                # неудач не идет, только освобождается пробная попытка
+                if trial:
+                    breaker.release_trial()
+                raise
+            except Exception as e:
+                # Ответ получен, но не обработан (например, ошибка декодирования)
+                breaker.record_success()
+                logger.error(f"Ошибка при загрузке страницы {url}: {e}")
+                return None
+            
+            breaker.record_failure()
+            if attempt == settings.HTTP_RETRIES:
+                logger.error(f"Ошибка при загрузке страницы {url}: {error}")
+                return None
+            
+            delay = backoff_delay(attempt, settings.HTTP_BACKOFF_BASE, settings.HTTP_BACKOFF_MAX)
+            if retry_after is not None:
+                if retry_after > settings.HTTP_BACKOFF_MAX:
+                    # Повтор раньше срока сервер снова отклонит
+                    logger.error(
+                        f"Ошибка при загрузке страницы {url}: {error}, "
+                        f"повтор не ранее чем через {retry_after:.0f} с"
+                    )
+                    return None
+                delay = max(delay, retry_after)
+            logger.warning(
+                f"Ошибка загрузки {url}: {error}, повтор {attempt + 1} через {delay:.1f} с"
+            )
+            await asyncio.sleep(delay)
+        
+        return None
+    
+    async def _send(self, url: str, headers: Dict[str, str]) -> HttpResponse:
+        """
+        Одна попытка GET-запроса
+        
+        Тело читается только для ответа 200. Ошибки сети пробрасываются
+        (aiohttp.ClientError, asyncio.TimeoutError) - их обрабатывает _request.
+        """
+        session = await self.get_session()
+        async with session.get(url, headers=headers) as response:
+            text = await self._read_text(response, url) if response.status == 200 else ''
+            return HttpResponse(response.status, text, CIMultiDict(response.headers))
+    
+    async def _read_text(self, response: aiohttp.ClientResponse, url: str) -> Optional[str]:
+        """
+        Потоковое чтение тела ответа с ограничением размера и декодирование
+        
+        Кодировка берется из Content-Type, затем из <meta charset>, иначе
+        UTF-8; ошибочные байты заменяются, без медленного определения
+        кодировки по содержимому.
+        
+        Returns:
+            str: Текст страницы или None, если она больше HTTP_MAX_PAGE_BYTES
+        """
+        limit = settings.HTTP_MAX_PAGE_BYTES
+        if response.content_length is not None and response.content_length > limit:
+            logger.warning(f"Страница {url} слишком большая: {response.content_length} байт")
+            return None
+        
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            body.extend(chunk)
+            if len(body) > limit:
+                logger.warning(f"Страница {url} больше {limit} байт, загрузка прервана")
+                return None
+        
+        return decode_body(bytes(body), response.charset)
+    
+    def _get_bucket(self, host: str) -> TokenBucket:
+        """Ограничитель частоты запросов к хосту"""
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(settings.HTTP_RATE_PER_HOST, settings.HTTP_RATE_BURST)
+        return self._buckets[host]
+    
+    def _get_breaker(self, host: str) -> CircuitBreaker:
+        """Предохранитель хоста"""
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(
+                settings.HTTP_CIRCUIT_THRESHOLD, settings.HTTP_CIRCUIT_RESET
+            )
+        return self._breakers[host]
+    
+    async def close(self):
+        """Закрытие сессии и всех соединений пула"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def decode_body(body: bytes, declared: Optional[str] = None) -> str:
+    """Декодирование страницы: заявленная кодировка, <meta charset> или UTF-8"""
+    encoding = declared
+    if not encoding:
+        match = _META_CHARSET.search(body, 0, 2048)
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = 'utf-8'
+    return body.decode(encoding, errors='replace')
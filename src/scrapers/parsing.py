@@ -0,0 +1,181 @@
+"""
+Извлечение карточек товаров из HTML
+
+Функции модуля выполняются в процессах пула парсинга, поэтому принимают
+и возвращают только простые типы (строки и кортежи), а не объекты soup.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.builder import builder_registry
+
+# Описание поля карточки: (CSS-селектор, атрибут); атрибут None - текст элемента
+FieldSpec = Tuple[Optional[str], Optional[str]]
+
+# Доступные бэкенды парсинга
+PARSER_HTML = "html.parser"      # встроенный, на чистом Python
+PARSER_LXML = "lxml"             # C-парсер lxml
+PARSER_LXML_PARTIAL = "lxml-partial"  # lxml, строятся только поддеревья карточек
+PARSERS = (PARSER_HTML, PARSER_LXML, PARSER_LXML_PARTIAL)
+
+# Простой селектор: tag, .class, tag.class.other (остальное - полный разбор)
+_SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$')
+# Простой составной селектор с атрибутами: a.result__link, [data-product]
+_SIMPLE_COMPOUND = re.compile(r'^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)((?:\[[\w-]+\])*)$')
+_ATTR = re.compile(r'\[([\w-]+)\]')
+
+_HAS_LXML = builder_registry.lookup('lxml') is not None
+
+
+def build_card_strainer(card_selector: str) -> Optional[SoupStrainer]:
+    """
+    SoupStrainer, оставляющий при разборе только контейнеры карточек
+    
+    Каждая часть селектора должна быть простой: все с классом (берется
+    первый класс) либо все - имена тегов. Отбор может быть шире селектора,
+    точный отбор карточек делается после разбора. None - частичный разбор
+    для селектора невозможен.
+    """
+    classes = []
+    tags = []
+    
+    for part in card_selector.split(','):
+        match = _SIMPLE_SELECTOR.match(part.strip())
+        if not match:
+            return None
+        tag, class_chain = match.groups()
+        if class_chain:
+            classes.append(class_chain.split('.')[1])
+        elif tag:
+            tags.append(tag)
+        else:
+            return None
+    
+    if classes and not tags:
+        # Во время разбора class еще не разбит на список - сравниваем по словам
+        pattern = '|'.join(re.escape(name) for name in classes)
+        return SoupStrainer(class_=re.compile(rf'(?:^|\s)(?:{pattern})(?:\s|$)'))
+    if tags and not classes:
+        return SoupStrainer(tags)
+    return None
+
+
+def parse_page(html: str, parser: str = PARSER_HTML, card_selector: Optional[str] = None) -> BeautifulSoup:
+    """Разбор страницы выбранным бэкендом"""
+    if parser != PARSER_HTML and not _HAS_LXML:
+        parser = PARSER_HTML
+    
+    if parser == PARSER_LXML_PARTIAL:
+        strainer = build_card_strainer(card_selector) if card_selector else None
+        if strainer is not None:
+            return BeautifulSoup(html, 'lxml', parse_only=strainer)
+        parser = PARSER_LXML
+    
+    return BeautifulSoup(html, parser)
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> Callable[[Tag], bool]:
+    """
+    Предикат совпадения элемента с CSS-селектором (компилируется один раз)
+    
+    Простые селекторы (tag, .class, tag.class, [attr] и их перечисления через
+    запятую) проверяются напрямую по имени и атрибутам тега, остальные -
+    через скомпилированный soupsieve.
+    """
+    alternatives = []
+    for part in selector.split(','):
+        match = _SIMPLE_COMPOUND.match(part.strip())
+        if not match or not any(match.groups()):
+            return soupsieve.compile(selector).match
+        tag, class_chain, attr_chain = match.groups()
+        classes = frozenset(class_chain.split('.')[1:]) if class_chain else frozenset()
+        attrs = tuple(_ATTR.findall(attr_chain)) if attr_chain else ()
+        alternatives.append((tag, classes, attrs))
+    
+    def matches(elem: Tag) -> bool:
+        for tag, classes, attrs in alternatives:
+            if tag is not None and elem.name != tag:
+                continue
+            if classes and not classes.issubset(elem.get('class') or ()):
+                continue
+            if attrs and not all(attr in elem.attrs for attr in attrs):
+                continue
+            return True
+        return False
+    
+    return matches
+
+
+def extract_page(
+    html: str,
+    card_selector: str,
+    fields: Sequence[FieldSpec],
+    parser: str = PARSER_HTML,
+    next_selector: Optional[str] = None
+) -> Tuple[List[Tuple[Optional[str], ...]], Optional[str]]:
+    """
+    Разбор страницы: поля карточек товаров и ссылка на следующую страницу
+    
+    Поля карточки извлекаются за один проход по ее потомкам: каждый элемент
+    проверяется предикатами еще не найденных полей (порядок документа, как
+    у select_one). Селектор поля None - поле всегда None.
+    
+    Returns:
+        Tuple: (карточки, href следующей страницы или None); карточка -
+            кортеж значений полей в порядке fields (None, если элемент или
+            атрибут не найден)
+    """
+    # При частичном разборе ссылка пагинации тоже должна попасть в дерево
+    strainer_selector = f"{card_selector}, {next_selector}" if next_selector else card_selector
+    soup = parse_page(html, parser, strainer_selector)
+    card_matches = compile_selector(card_selector)
+    field_matchers = [
+        (index, compile_selector(selector), attr)
+        for index, (selector, attr) in enumerate(fields)
+        if selector
+    ]
+    cards = []
+    
+    for card in soup.find_all(card_matches):
+        values: List[Optional[str]] = [None] * len(fields)
+        pending = list(field_matchers)
+        
+        for elem in card.descendants:
+            if not isinstance(elem, Tag):
+                continue
+            for item in tuple(pending):
+                index, matches, attr = item
+                if not matches(elem):
+                    continue
+                if attr is None:
+                    values[index] = elem.get_text(strip=True)
+                else:
+                    value = elem.get(attr)
+                    values[index] = value if isinstance(value, str) else None
+                pending.remove(item)
+            if not pending:
+                break
+        
+        cards.append(tuple(values))
+    
+    next_href = None
+    if next_selector:
+        next_link = soup.find(compile_selector(next_selector))
+        href = next_link.get('href') if next_link is not None else None
+        next_href = href if isinstance(href, str) and href else None
+    
+    return cards, next_href
+
+
+def extract_cards(
+    html: str,
+    card_selector: str,
+    fields: Sequence[FieldSpec],
+    parser: str = PARSER_HTML
+) -> List[Tuple[Optional[str], ...]]:
+    """Разбор страницы и извлечение полей из каждой карточки товара"""
+    return extract_page(html, card_selector, fields, parser)[0]
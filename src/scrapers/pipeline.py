@@ -0,0 +1,140 @@
+"""
+Конвейер записи скидок: скраперы -> очередь -> пакетная запись в БД
+"""
+
+import asyncio
+import logging
+from typing import List, Dict, Optional, Tuple
+
+from config.settings import settings
+from src.scrapers.base import BaseScraper
+from src.database.crud import save_discounts_bulk, resolve_store_id
+from src.database.records import DiscountRecord
+
+logger = logging.getLogger(__name__)
+
+# Элемент очереди: скрапер-источник и данные скидки
+QueueItem = Tuple[BaseScraper, DiscountRecord]
+
+
+class IngestPipeline:
+    """
+    Конвейер производитель/потребитель для записи скидок.
+    
+    Скраперы кладут скидки в ограниченную очередь, отдельная задача-писатель
+    забирает их пакетами и сохраняет в БД. Загрузка страниц, парсинг и запись
+    в SQLite идут одновременно, а переполненная очередь притормаживает скраперы.
+    """
+    
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.queue: asyncio.Queue = asyncio.Queue(
+            maxsize=queue_size or settings.INGEST_QUEUE_SIZE
+        )
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.saved = 0
+        # Ошибки записи по магазинам: часть скидок магазина не сохранена
+        self.errors: Dict[str, str] = {}
+        # Скидки магазина, еще не обработанные писателем (для flush)
+        self._pending: Dict[str, int] = {}
+        self._written = asyncio.Condition()
+        self._writer: Optional[asyncio.Task] = None
+        
+    def start(self):
+        """Запуск задачи-писателя"""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run_writer())
+        
+    async def put(self, scraper: BaseScraper, discount: DiscountRecord):
+        """Добавить скидку в очередь (ждет, если очередь заполнена)"""
+        self._pending[discount.store_name] = self._pending.get(discount.store_name, 0) + 1
+        await self.queue.put((scraper, discount))
+    
+    async def flush(self, store_name: str) -> Optional[str]:
+        """
+        Дождаться записи всех скидок магазина, уже отданных в конвейер
+        
+        Returns:
+            Ошибка записи магазина или None, если все его пакеты записаны
+        """
+        if self._writer is not None:
+            async with self._written:
+                await self._written.wait_for(lambda: not self._pending.get(store_name))
+        return self.errors.get(store_name)
+        
+    async def close(self) -> int:
+        """
+        Дождаться записи всех скидок из очереди
+        
+        Returns:
+            int: Количество сохраненных скидок (магазины, часть скидок
+                которых не записана, - в errors)
+        """
+        if self._writer is not None:
+            await self.queue.put(None)
+            await self._writer
+            self._writer = None
+        return self.saved
+    
+    async def _run_writer(self):
+        """Задача-писатель: забирает скидки пакетами и сохраняет их"""
+        finished = False
+        
+        while not finished:
+            item = await self.queue.get()
+            if item is None:
+                break
+            
+            batch: List[QueueItem] = [item]
+            # Добираем пакет тем, что уже лежит в очереди, не дожидаясь новых скидок
+            while len(batch) < self.batch_size and not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+            
+            try:
+                self.saved += await self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Ошибка записи пакета скидок: {e}")
+                for scraper, _ in batch:
+                    self.errors.setdefault(scraper.store_name, str(e) or type(e).__name__)
+            finally:
+                for _, discount in batch:
+                    self._pending[discount.store_name] -= 1
+                async with self._written:
+                    self._written.notify_all()
+    
+    async def _write_batch(self, batch: List[QueueItem]) -> int:
+        """Сохранение пакета скидок: одна транзакция на каждый магазин пакета"""
+        saved = 0
+        by_store: Dict[str, Tuple[BaseScraper, List[DiscountRecord]]] = {}
+        
+        for scraper, discount in batch:
+            store_name = discount.store_name
+            if store_name not in by_store:
+                by_store[store_name] = (scraper, [])
+            by_store[store_name][1].append(discount)
+        
+        for store_name, (scraper, discounts) in by_store.items():
+            try:
+                # Магазин берется из кэша, в БД идем только для нового магазина
+                store_id = await resolve_store_id(
+                    name=store_name,
+                    category=discounts[0].category,
+                    website=scraper.base_url
+                )
+                
+                counts = await save_discounts_bulk(store_id, discounts)
+                saved += counts['inserted'] + counts['updated']
+                
+            except Exception as e:
+                logger.error(f"Ошибка сохранения скидок {store_name}: {e}")
+                self.errors.setdefault(store_name, str(e) or type(e).__name__)
+                continue
+        
+        return saved
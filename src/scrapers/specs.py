@@ -0,0 +1,324 @@
+"""
+Декларативные описания магазинов и универсальный скрапер
+"""
+
+import sys
+import json
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union, AsyncIterator, Tuple, Set
+from urllib.parse import urljoin, urlparse, parse_qsl, urlencode, urlunparse
+
+from config.settings import settings
+from src.database.records import DiscountRecord
+from src.scrapers.base import BaseScraper
+from src.scrapers.dedup import product_identities
+from src.scrapers.prices import parse_prices
+
+logger = logging.getLogger(__name__)
+
+# Порядок полей карточки, в котором их возвращает extract_cards
+CARD_FIELDS = ('title', 'old_price', 'new_price', 'image', 'link')
+# Атрибут, из которого берется значение поля (None - текст элемента)
+CARD_FIELD_ATTRS = {'image': 'src', 'link': 'href'}
+# Ограничение глубины обхода каталога с пагинацией по умолчанию
+DEFAULT_MAX_PAGES = 20
+
+
+@dataclass
+class StoreSpec:
+    """Описание магазина: адреса страниц акций, селекторы карточек и города"""
+    
+    name: str
+    category: str
+    base_url: str
+    urls: List[str]
+    card: Optional[str]
+    fields: Dict[str, str]
+    cities: Union[List[str], str] = field(default_factory=lambda: ["Минск"])
+    valid_days: int = 7
+    parser: Optional[str] = None
+    title_max_length: Optional[int] = None
+    # Пагинация: параметр номера страницы в URL либо селектор ссылки "Далее"
+    page_param: Optional[str] = None
+    next_page: Optional[str] = None
+    max_pages: int = 1
+    enabled: bool = True
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StoreSpec":
+        """Создание описания из записи файла магазинов"""
+        unknown = set(data.get('fields', {})) - set(CARD_FIELDS)
+        if unknown:
+            raise ValueError(f"Неизвестные поля карточки {data.get('name')}: {sorted(unknown)}")
+        paginated = bool(data.get('page_param') or data.get('next_page'))
+        cities = data.get('cities', ["Минск"])
+        if isinstance(cities, list):
+            # Названия городов повторяются во всех магазинах - один объект строки
+            cities = [sys.intern(city) for city in cities]
+        return cls(
+            name=data['name'],
+            category=data['category'],
+            base_url=data.get('base_url') or '',
+            urls=list(data.get('urls', [])),
+            card=data.get('card'),
+            fields=dict(data.get('fields', {})),
+            cities=cities,
+            valid_days=int(data.get('valid_days', 7)),
+            parser=data.get('parser'),
+            title_max_length=data.get('title_max_length'),
+            page_param=data.get('page_param'),
+            next_page=data.get('next_page'),
+            max_pages=int(data.get('max_pages', DEFAULT_MAX_PAGES if paginated else 1)),
+            enabled=bool(data.get('enabled', True))
+        )
+
+
+def load_store_specs(path: Optional[Union[str, Path]] = None) -> List[StoreSpec]:
+    """Загрузка описаний магазинов из JSON файла (по умолчанию settings.STORES_FILE)"""
+    path = Path(path or settings.STORES_FILE)
+    with open(path, encoding='utf-8') as f:
+        return [StoreSpec.from_dict(item) for item in json.load(f)]
+
+
+def card_fingerprint(card: Tuple[Optional[str], ...]) -> str:
+    """Отпечаток карточки: хэш значений всех ее полей"""
+    data = '\x1f'.join(value or '' for value in card)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SpecScraper(BaseScraper):
+    """
+    Универсальный скрапер, работающий по описанию магазина.
+    
+    Селекторы полей компилируются один раз (см. parsing.compile_selector),
+    а поля карточки извлекаются за один проход по ее элементам.
+    """
+    
+    def __init__(self, spec: StoreSpec):
+        super().__init__(
+            base_url=spec.base_url,
+            store_name=spec.name,
+            category=spec.category
+        )
+        self.spec = spec
+        self.cities = spec.cities
+        self.parser = spec.parser
+        self.valid_days = spec.valid_days
+        self._fields = tuple(
+            (spec.fields.get(name), CARD_FIELD_ATTRS.get(name))
+            for name in CARD_FIELDS
+        )
+        # Отпечатки карточек текущего обхода, ставших скидками
+        self._stored_fingerprints: Set[str] = set()
+        # Страницы текущего обхода, которые не удалось загрузить
+        self._unavailable: Set[str] = set()
+    
+    async def scrape_discounts(self) -> List[DiscountRecord]:
+        """Получение скидок со всех страниц акций магазина"""
+        return [discount async for discount in self.iter_discounts()]
+    
+    async def iter_discounts(self) -> AsyncIterator[DiscountRecord]:
+        """
+        Потоковый обход страниц акций магазина с учетом пагинации
+        
+        Скидки отдаются постранично, поэтому в памяти одновременно находятся
+        только страницы текущей порции, а не весь каталог.
+        """
+        self.unchanged_pages = 0
+        self.unchanged_fingerprints = set()
+        self.page_updates = {}
+        self.duplicates.reset()
+        self.failed_urls = []
+        self._stored_fingerprints = set()
+        self._unavailable = set()
+        if not self.spec.card:
+            return
+        
+        for path in self.spec.urls:
+            url = self.base_url + path
+            if self.spec.page_param:
+                pages = self._iter_numbered_pages(url)
+            else:
+                pages = self._iter_linked_pages(url)
+            
+            async for cards in pages:
+                for discount in self._build_discounts(cards):
+                    yield discount
+            # Недоступная первая страница - не пустой каталог: скидки
+            # магазина не получены, а не исчезли
+            if url in self._unavailable:
+                self.failed_urls.append(url)
+        
+        # В записи страницы остаются только отпечатки карточек, ставших
+        # скидками: неполные карточки и повторы в БД не попадают, и страница
+        # с ними никогда не считалась бы неизменившейся
+        for page in self.page_updates.values():
+            page['card_fingerprints'] = ' '.join(
+                fingerprint for fingerprint in page['card_fingerprints']
+                if fingerprint in self._stored_fingerprints
+            )
+    
+    async def _iter_numbered_pages(self, url: str) -> AsyncIterator[List[Tuple[str, Tuple]]]:
+        """
+        Страницы с номером в параметре URL (?page=N, "Показать еще")
+        
+        Страницы загружаются порциями по HTTP_POOL_LIMIT_PER_HOST параллельно;
+        обход заканчивается на первой пустой или недоступной странице.
+        """
+        window = max(1, settings.HTTP_POOL_LIMIT_PER_HOST)
+        
+        for first in range(1, self.spec.max_pages + 1, window):
+            numbers = range(first, min(first + window, self.spec.max_pages + 1))
+            results = await asyncio.gather(*(
+                self._fetch_cards(self._page_url(url, number)) for number in numbers
+            ))
+            
+            for cards, _, unchanged in results:
+                if unchanged:
+                    continue
+                if not cards:
+                    return
+                yield cards
+    
+    async def _iter_linked_pages(self, url: str) -> AsyncIterator[List[Tuple[str, Tuple]]]:
+        """Страницы, связанные ссылкой "Далее" (или одна страница без пагинации)"""
+        seen = set()
+        
+        while url and url not in seen and len(seen) < self.spec.max_pages:
+            seen.add(url)
+            cards, next_href, unchanged = await self._fetch_cards(url, self.spec.next_page)
+            if not unchanged:
+                if not cards:
+                    return
+                yield cards
+            url = urljoin(url, next_href) if next_href else None
+    
+    async def _fetch_cards(
+        self,
+        url: str,
+        next_selector: Optional[str] = None
+    ) -> Tuple[List[Tuple[str, Tuple]], Optional[str], bool]:
+        """
+        Загрузка страницы и извлечение карточек и ссылки на следующую
+        
+        Страница, хэш которой совпал с сохраненным в page_fingerprints,
+        не разбирается: отпечатки ее карточек уходят в unchanged_fingerprints.
+        Страница разбирается заново, если хотя бы одной ее скидки нет среди
+        known_fingerprints (например, ее пакет не записался в прошлый раз).
+        
+        Returns:
+            Tuple: ([(отпечаток, карточка)], href следующей страницы,
+                страница не изменилась)
+        """
+        result = await self.fetch_page_result(url)
+        
+        if not result:
+            logger.warning(f"Не удалось загрузить страницу {self.store_name}: {url}")
+            self._unavailable.add(url)
+            return [], None, False
+        
+        # Сравнение с хэшем из БД, а не с HTTP-кэшем: кэш обновляется
+        # при загрузке, даже если скидки страницы потом не записались
+        state = self.page_state.get(url)
+        if self.known_fingerprints and state and state['content_hash'] == result.content_hash:
+            if not state['card_count']:
+                return [], None, False
+            fingerprints = state['card_fingerprints'].split()
+            if self.known_fingerprints.issuperset(fingerprints):
+                self.unchanged_pages += 1
+                self.unchanged_fingerprints.update(fingerprints)
+                return [], state['next_href'], True
+        
+        cards, next_href = await self.extract_page(
+            result.text, self.spec.card, self._fields, next_selector
+        )
+        cards = [(card_fingerprint(card), card) for card in cards]
+        self.page_updates[url] = {
+            'content_hash': result.content_hash,
+            'next_href': next_href,
+            'card_count': len(cards),
+            # Отбираются после разбора, см. iter_discounts
+            'card_fingerprints': [fingerprint for fingerprint, _ in cards]
+        }
+        
+        return cards, next_href, False
+    
+    def _page_url(self, url: str, number: int) -> str:
+        """URL страницы с номером number (первая - исходный URL)"""
+        if number == 1:
+            return url
+        parts = urlparse(url)
+        query = [(key, value) for key, value in parse_qsl(parts.query) if key != self.spec.page_param]
+        query.append((self.spec.page_param, str(number)))
+        return urlunparse(parts._replace(query=urlencode(query)))
+    
+    def _build_discounts(self, cards) -> List[DiscountRecord]:
+        """
+        Скидки из извлеченных карточек
+        
+        Повторы товара, уже встреченного в этом обходе (вложенные карточки,
+        тот же товар на другой странице, то же название - ключ записи в БД),
+        отбрасываются до разбора цен.
+        Карточки с отпечатком из known_fingerprints не изменились: цены
+        не разбираются, скидка только продлевается (unchanged_fingerprints).
+        """
+        discounts = []
+        # Срок действия одинаков для всей страницы
+        valid_until = datetime.now() + timedelta(days=self.valid_days)
+        
+        changed = []
+        for fingerprint, card in cards:
+            title, _, new_price_text, _, link_href = card
+            # Неполная карточка (например, вложенный элемент) не занимает товар
+            if not (title and new_price_text):
+                continue
+            if self.spec.title_max_length:
+                title = title[:self.spec.title_max_length]
+            product_url = self.base_url + link_href if link_href else None
+            if self.duplicates.is_duplicate(product_identities(product_url, title)):
+                continue
+            if fingerprint in self.known_fingerprints:
+                self.unchanged_fingerprints.add(fingerprint)
+                self._stored_fingerprints.add(fingerprint)
+            else:
+                changed.append((fingerprint, title, card))
+        
+        # Все цены страницы разбираются одним вызовом: сначала новые, затем старые
+        prices = parse_prices(
+            [card[2] for _, _, card in changed] + [card[1] for _, _, card in changed]
+        )
+        count = len(changed)
+        
+        for index, (fingerprint, title, card) in enumerate(changed):
+            _, old_price_text, _, image_src, link_href = card
+            try:
+                new_price = prices[index]
+                old_price = prices[count + index] if old_price_text else new_price
+                
+                if old_price <= 0 or new_price <= 0:
+                    continue
+                
+                discounts.append(DiscountRecord(
+                    title=title,
+                    old_price=old_price,
+                    new_price=new_price,
+                    discount_percent=self.calculate_discount_percent(old_price, new_price),
+                    image_url=image_src,
+                    product_url=self.base_url + link_href if link_href else None,
+                    valid_until=valid_until,
+                    store_name=self.store_name,
+                    category=self.category,
+                    fingerprint=fingerprint
+                ))
+                self._stored_fingerprints.add(fingerprint)
+            
+            except Exception as e:
+                logger.debug(f"Ошибка парсинга карточки {self.store_name}: {e}")
+                continue
+        
+        return discounts
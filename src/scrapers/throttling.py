@@ -0,0 +1,116 @@
+"""
+Ограничение частоты запросов и защита от недоступных хостов
+"""
+
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов к хосту (token bucket).
+    
+    Токены пополняются со скоростью rate в секунду до capacity;
+    каждый запрос забирает один токен или ждет его появления.
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Дождаться токена (rate <= 0 - без ограничения)"""
+        if self.rate <= 0:
+            return
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Предохранитель хоста.
+    
+    После threshold неудачных попыток подряд хост считается недоступным
+    и запросы к нему сразу отклоняются. Через reset_timeout секунд
+    пропускается одна пробная попытка: успех закрывает предохранитель,
+    неудача снова открывает его. Отмененная пробная попытка освобождается
+    (release_trial) и ничего не говорит о хосте; незавершенная по другой
+    причине сменяется следующей еще через reset_timeout.
+    """
+    
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+    
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+    
+    def allow(self) -> bool:
+        """Можно ли выполнить запрос к хосту"""
+        if self._opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at < self.reset_timeout:
+            return False
+        # Пробная попытка после паузы; пауза отсчитывается заново, поэтому
+        # до ее результата остальные запросы отклоняются
+        self._trial = True
+        self._opened_at = now
+        return True
+    
+    def release_trial(self):
+        """Пробная попытка отменена: следующий запрос снова может стать пробным"""
+        if self._trial:
+            self._trial = False
+            self._opened_at = time.monotonic() - self.reset_timeout
+    
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+    
+    def record_failure(self):
+        self.failures += 1
+        if self._trial or (self.threshold > 0 and self.failures >= self.threshold):
+            self._opened_at = time.monotonic()
+        self._trial = False
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Экспоненциальная задержка перед повтором со случайным разбросом (full jitter)"""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Задержка из заголовка Retry-After: число секунд или HTTP-дата"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
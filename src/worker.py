@@ -0,0 +1,240 @@
+"""
+Обработчик заданий скрапинга
+
+Бот только ставит задания в очередь (src/database/job_queue.py), а загрузка
+и разбор страниц идут в отдельных процессах и не занимают цикл событий бота.
+Каждый процесс берет из очереди по одному заданию (магазину) за раз.
+
+Использование:
+    python -m src.worker                    # SCRAPE_WORKERS процессов
+    python -m src.worker --processes 4
+    python -m src.worker --enqueue --once   # поставить все магазины, обработать и выйти
+"""
+
+import os
+import signal
+import socket
+import asyncio
+import logging
+import argparse
+import multiprocessing
+from typing import Awaitable, Callable, Optional
+
+from config.settings import settings
+from src.database.models import init_db, engine, read_engine, ScrapeJob
+from src.database.store_registry import store_registry
+from src.database.crud import rebuild_leaderboard
+from src.database.job_queue import (
+    enqueue_scrape_jobs,
+    claim_scrape_job,
+    extend_scrape_job,
+    finish_scrape_job,
+    fail_scrape_job,
+    has_active_scrape_jobs,
+    prune_scrape_jobs
+)
+from src.scrapers import DiscountScraper, load_store_specs
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging():
+    """Логирование процесса-обработчика (формат как у бота)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('data/worker.log', encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+
+class ScrapeWorker:
+    """
+    Обработчик очереди заданий скрапинга в одном процессе.
+    
+    Пока задание выполняется, его срок в очереди продлевается; топ скидок
+    перестраивается один раз, когда очередь опустела, а не после каждого магазина.
+    """
+    
+    def __init__(self, name: str, once: bool = False):
+        self.name = name
+        self.once = once
+        self.scraper: Optional[DiscountScraper] = None
+        self._stopping = asyncio.Event()
+        self._leaderboard_stale = False
+    
+    def stop(self):
+        """Остановка после текущего задания"""
+        self._stopping.set()
+    
+    async def run(self):
+        """Цикл обработки заданий до остановки (с once - до опустевшей очереди)"""
+        self.scraper = DiscountScraper()
+        await store_registry.warm()
+        logger.info(f"Обработчик {self.name} запущен")
+        
+        try:
+            while not self._stopping.is_set():
+                try:
+                    job = await claim_scrape_job(self.name)
+                    if job is not None:
+                        await self._run_job(job)
+                        continue
+                    await self._on_idle()
+                except Exception as e:
+                    # Например, database is locked при записи несколькими
+                    # процессами: процесс не завершается, очередь опрашивается снова
+                    logger.error(f"Ошибка очереди заданий: {e}")
+                else:
+                    # С once топ, устаревший после наших заданий, перестраивается
+                    # и тогда, когда последнее задание выполнил другой процесс
+                    if self.once and not self._leaderboard_stale:
+                        break
+                await self._wait(settings.SCRAPE_JOB_POLL_INTERVAL)
+        finally:
+            await self.scraper.close()
+            logger.info(f"Обработчик {self.name} остановлен")
+    
+    async def _wait(self, seconds: float):
+        """Пауза до следующей проверки очереди (прерывается остановкой)"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _run_job(self, job: ScrapeJob):
+        """Выполнение одного задания: скрапинг магазина job.store_name"""
+        if job.store_name not in {scraper.store_name for scraper in self.scraper.scrapers}:
+            await self._finish(job, fail_scrape_job, "Магазин не найден или отключен")
+            return
+        
+        logger.info(f"Задание {job.id}: {job.store_name} (попытка {job.attempts})")
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            saved = await self.scraper.update_all_discounts(stores={job.store_name}, leaderboard=False)
+        except Exception as e:
+            logger.error(f"Задание {job.id} завершилось ошибкой: {e}")
+            await self._finish(job, fail_scrape_job, str(e) or type(e).__name__)
+            return
+        finally:
+            heartbeat.cancel()
+        
+        if saved:
+            self._leaderboard_stale = True
+        # Ошибка обхода или записи (например, database is locked при записи
+        # несколькими процессами): задание повторяется, а не считается выполненным
+        error = self.scraper.last_run_errors.get(job.store_name)
+        if error:
+            logger.warning(f"Задание {job.id}: {error} (записано {saved}), задание будет повторено")
+            await self._finish(job, fail_scrape_job, error, saved)
+        else:
+            await self._finish(job, finish_scrape_job, saved)
+    
+    async def _finish(self, job: ScrapeJob, update: Callable[..., Awaitable[bool]], *args):
+        """
+        Запись результата задания (finish_scrape_job / fail_scrape_job) с
+        повторами: результат обхода не теряется из-за временной блокировки БД
+        """
+        for attempt in range(1, settings.SCRAPE_JOB_MAX_ATTEMPTS + 1):
+            try:
+                if not await update(job.id, self.name, *args):
+                    logger.warning(f"Задание {job.id} уже забрал другой обработчик, результат не записан")
+                return
+            except Exception as e:
+                logger.error(f"Не удалось записать результат задания {job.id}: {e}")
+                if attempt == settings.SCRAPE_JOB_MAX_ATTEMPTS:
+                    # Задание вернется в очередь по истечении срока
+                    return
+                await asyncio.sleep(settings.SCRAPE_JOB_POLL_INTERVAL)
+    
+    async def _heartbeat(self, job_id: int):
+        """Продление срока задания, пока оно выполняется"""
+        while True:
+            await asyncio.sleep(settings.SCRAPE_JOB_LEASE / 3)
+            try:
+                await extend_scrape_job(job_id, self.name)
+            except Exception as e:
+                logger.warning(f"Не удалось продлить задание {job_id}: {e}")
+    
+    async def _on_idle(self):
+        """Очередь пуста: перестроить топ, если после него записывались скидки"""
+        if not self._leaderboard_stale or await has_active_scrape_jobs():
+            return
+        try:
+            entries = await rebuild_leaderboard()
+            logger.info(f"Топ скидок перестроен: {entries} позиций")
+            self._leaderboard_stale = False
+        except Exception as e:
+            logger.error(f"Ошибка построения топа скидок: {e}")
+
+
+async def serve(once: bool):
+    """Обработчик в текущем процессе; SIGINT/SIGTERM - остановка после задания"""
+    worker = ScrapeWorker(f"{socket.gethostname()}:{os.getpid()}", once=once)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+def worker_process(once: bool):
+    """Точка входа дочернего процесса"""
+    setup_logging()
+    asyncio.run(serve(once))
+
+
+async def prepare(enqueue: bool):
+    """Схема БД и очистка очереди - один раз до запуска обработчиков"""
+    await init_db()
+    pruned = await prune_scrape_jobs()
+    if pruned:
+        logger.info(f"Удалено завершенных заданий: {pruned}")
+    if enqueue:
+        names = [spec.name for spec in load_store_specs() if spec.enabled]
+        logger.info(f"Поставлено заданий: {await enqueue_scrape_jobs(names)}")
+    # Соединения этого цикла событий не переходят в цикл обработчика
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--processes', type=int, default=settings.SCRAPE_WORKERS,
+                            help="Количество процессов-обработчиков")
+    arg_parser.add_argument('--enqueue', action='store_true',
+                            help="Поставить задания для всех включенных магазинов")
+    arg_parser.add_argument('--once', action='store_true',
+                            help="Завершиться, когда очередь опустеет")
+    args = arg_parser.parse_args()
+    
+    setup_logging()
+    asyncio.run(prepare(args.enqueue))
+    
+    if args.processes <= 1:
+        asyncio.run(serve(args.once))
+        return
+    
+    # spawn: дочерние процессы не наследуют соединения и пулы родителя
+    context = multiprocessing.get_context('spawn')
+    processes = [
+        context.Process(target=worker_process, args=(args.once,), name=f"worker-{number}")
+        for number in range(1, args.processes + 1)
+    ]
+    for process in processes:
+        process.start()
+    
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+Общие настройки тестов
+"""
+
+import os
+
+# Настройки читаются при импорте модулей src; токен бота в тестах не нужен
+os.environ.setdefault('BOT_TOKEN', 'test')
@@ -0,0 +1,18 @@
+"""
+Разбор цен BYN: корпус записей цен с сайтов белорусских магазинов
+"""
+
+import pytest
+
+from src.scrapers.prices import parse_price, parse_prices
+from benchmarks.price_corpus import PRICE_CORPUS
+
+
+@pytest.mark.parametrize("text, expected", PRICE_CORPUS)
+def test_parse_price(text, expected):
+    assert parse_price(text) == pytest.approx(expected)
+
+
+def test_parse_prices_matches_corpus():
+    values = parse_prices([text for text, _ in PRICE_CORPUS])
+    assert values == pytest.approx([expected for _, expected in PRICE_CORPUS])
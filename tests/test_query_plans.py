@@ -0,0 +1,37 @@
+"""
+Планы запросов чтения скидок: ix_discounts_active_percent без сортировки
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.database.models import Base
+from src.database.crud import _best_discounts_query, _category_discounts_query
+
+
+@pytest.fixture
+def connection():
+    """Схема модели в памяти, без статистики ANALYZE (как на новой базе)"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+def query_plan(conn, query) -> str:
+    """EXPLAIN QUERY PLAN запроса одной строкой"""
+    sql = str(query.compile(conn.engine, compile_kwargs={'literal_binds': True}))
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("query", [
+    _best_discounts_query("Минск", 10, 0),
+    _best_discounts_query("Минск", 10, 3),
+    _category_discounts_query("Минск", "grocery", 20, 0),
+])
+def test_top_discounts_use_percent_index(connection, query):
+    plan = query_plan(connection, query)
+    assert "ix_discounts_active_percent" in plan
+    assert "TEMP B-TREE" not in plan